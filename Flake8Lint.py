@@ -6,22 +6,39 @@ Check Python files with flake8 (PEP8, pyflake and mccabe)
 """
 from __future__ import print_function
 
+import bisect
+import collections
 import fnmatch
+import hashlib
+import io
 import itertools
+import json
 import os
 import re
 import sys
+import threading
 import time
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 import sublime
 import sublime_plugin
 
 try:
     from .color_theme import update_color_scheme
-    from .lint import lint, lint_external, load_flake8_config, tools_versions
+    from .lint import (
+        Stopwatch, complexity_table, forget_complexity_table, lint,
+        lint_external, load_flake8_config, tools_versions
+    )
 except (ValueError, SystemError):
     from color_theme import update_color_scheme
-    from lint import lint, lint_external, load_flake8_config, tools_versions
+    from lint import (
+        Stopwatch, complexity_table, forget_complexity_table, lint,
+        lint_external, load_flake8_config, tools_versions
+    )
 
 
 __version__ = '2.4.3'
@@ -48,13 +65,184 @@ PROJECT_SETTINGS_KEYS = (
     'naming', 'debugger', 'import_order', 'import_order_style', 'complexity',
     'pep8_max_line_length', 'select', 'ignore', 'ignore_files',
     'use_flake8_global_config', 'use_flake8_project_config',
+    'star_import_index',
 )
 FLAKE8_SETTINGS_KEYS = (
     'ignore', 'select', 'ignore_files', 'pep8_max_line_length'
 )
 
+# paint only regions around the visible area if there are more of them
+REGIONS_PAINT_LIMIT = 1000
+# lines painted above and below the visible area
+REGIONS_MARGIN_LINES = 200
+# how often (in milliseconds) view is checked for scrolling
+REGIONS_POLL_DELAY = 250
+# how many times view readiness is checked by timer after view event
+LOAD_RETRIES = 30
+# delay (in milliseconds) between view readiness checks
+LOAD_RETRY_DELAY = 100
+# group errors by code in quick panel if there are more of them
+QUICK_PANEL_LIMIT = 500
+# errors shown in one page of quick panel
+QUICK_PANEL_PAGE = 500
+
+# lint phases measured by lint and the checkers settings they depend on
+CHECKERS_PHASES = (
+    ('pep8', ('pep8',)),
+    ('pyflakes', ('pyflakes',)),
+    ('pydocstyle', ('pydocstyle',)),
+    ('ast checkers', ('naming', 'debugger', 'import_order', 'complexity')),
+    ('import order', ('import_order',)),
+    ('complexity', ('complexity',)),
+)
+# error codes reported by lint phases
+PHASES_CODES = (
+    ('pep8', ('E1', 'E2', 'E3', 'E4', 'E5', 'E7', 'W')),
+    ('pyflakes', ('F',)),
+    ('pydocstyle', ('D',)),
+    ('ast checkers', ('N', 'T')),
+    ('import order', ('I',)),
+    ('complexity', ('C9',)),
+)
+# run live mode lint with deferred checkers after this delay (in milliseconds)
+LIVE_MODE_IDLE_DELAY = 2000
+
+# keep lint results of this number of the most recently used views
+VIEWS_LIMIT = 100
+# project lint output panel name
+PROJECT_PANEL = 'flake8lint'
+# project lint output line regex: file, line, column and error
+PROJECT_RESULT_REGEX = r'^(.+):(\d+):(\d+): (.*)$'
+# keep this number of the latest lint timings of every view
+VIEW_TIMINGS_SAMPLES = 50
+# keep this number of the latest lint timings of the whole session
+SESSION_TIMINGS_SAMPLES = 1000
+
+
+class ViewStore(object):
+    """Values by view id, bounded to the most recently used views.
+
+    Store is used by lint thread and UI thread, so it is guarded by lock.
+    """
+
+    def __init__(self, max_size):
+        """Initialize store."""
+        self.max_size = max_size
+        self.values = {}
+        self.used = {}
+        self.clock = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, view_id):
+        """Check if store has a value of view."""
+        with self.lock:
+            return view_id in self.values
+
+    def __setitem__(self, view_id, value):
+        """Set value of view, forget the least recently used view."""
+        with self.lock:
+            self.values[view_id] = value
+            self.touch(view_id)
+            if len(self.values) > self.max_size:
+                oldest = min(self.used, key=self.used.get)
+                log("forget lint results of view {0}", oldest)
+                del self.used[oldest]
+                del self.values[oldest]
+
+    def touch(self, view_id):
+        """Mark view as used (lock must be held)."""
+        self.clock += 1
+        self.used[view_id] = self.clock
+
+    def get(self, view_id, default=None):
+        """Return value of view and mark view as used."""
+        with self.lock:
+            if view_id not in self.values:
+                return default
+            self.touch(view_id)
+            return self.values[view_id]
+
+    def peek(self, view_id, default=None):
+        """Return value of view without marking view as used."""
+        with self.lock:
+            return self.values.get(view_id, default)
+
+    def pop(self, view_id, default=None):
+        """Remove value of view and return it."""
+        with self.lock:
+            self.used.pop(view_id, None)
+            return self.values.pop(view_id, default)
+
+
+class LintTimings(object):
+    """Rolling lint phases durations of views and of the whole session."""
+
+    def __init__(self):
+        """Initialize timings."""
+        self.views = ViewStore(VIEWS_LIMIT)
+        self.session = {}
+        self.lock = threading.Lock()
+
+    def add(self, view_id, timings):
+        """Add durations of view lint phases."""
+        with self.lock:
+            view_timings = self.views.get(view_id)
+            if view_timings is None:
+                view_timings = self.views[view_id] = {}
+            for phase, duration in timings.items():
+                if phase not in view_timings:
+                    view_timings[phase] = collections.deque(
+                        maxlen=VIEW_TIMINGS_SAMPLES
+                    )
+                    if phase not in self.session:
+                        self.session[phase] = collections.deque(
+                            maxlen=SESSION_TIMINGS_SAMPLES
+                        )
+                view_timings[phase].append(duration)
+                self.session[phase].append(duration)
+
+    def forget(self, view_id):
+        """Forget durations of view lint phases."""
+        with self.lock:
+            self.views.pop(view_id)
+
+    @staticmethod
+    def percentiles(samples):
+        """Return (median, 95th percentile) of samples."""
+        samples = sorted(samples)
+        count = len(samples)
+        return samples[(count - 1) // 2], samples[(count * 95 - 1) // 100]
+
+    def report(self, view_id=None):
+        """Return phases statistics of view or session.
+
+        Rows are (phase, samples count, median, 95th percentile) tuples,
+        the slowest phases first.
+        """
+        with self.lock:
+            if view_id is None:
+                timings = self.session
+            else:
+                timings = self.views.peek(view_id) or {}
+            timings = [(phase, list(samples))
+                       for phase, samples in timings.items()]
+
+        table = []
+        for phase, samples in timings:
+            p50, p95 = self.percentiles(samples)
+            table.append((phase, len(samples), p50, p95))
+        table.sort(key=lambda row: (-row[3], row[0]))
+        return table
+
+
 DISABLED_VIEWS = set()
-ERRORS_IN_VIEWS = {}
+ERRORS_IN_VIEWS = ViewStore(VIEWS_LIMIT)
+REGIONS_IN_VIEWS = ViewStore(VIEWS_LIMIT)
+PENDING_VIEWS = {}
+PROJECT_LINTS = {}
+LINT_RESULTS = ViewStore(VIEWS_LIMIT)
+TRACE_LOCK = threading.Lock()
+LINT_TIMINGS = LintTimings()
 PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
@@ -84,6 +272,11 @@ class Flake8LintSettings(object):
         # debug mode (verbose output to ST python console)
         self.debug = bool(self.settings.get('debug', False))
 
+        # write lint events as JSON lines to this file ("" to turn off)
+        self.trace_file = self.settings.get('trace_file') or ''
+        if self.trace_file:
+            self.trace_file = os.path.expanduser(self.trace_file)
+
         # run flake8 lint on file saving
         self.lint_on_save = bool(self.settings.get('lint_on_save', True))
 
@@ -102,6 +295,16 @@ class Flake8LintSettings(object):
         except (ValueError, TypeError):
             self.live_mode_lint_delay = 1000
 
+        # set live mode lint time budget, in milliseconds (0 to turn off):
+        # checkers which do not fit in it run when typing is paused for a
+        # while or on file saving only, their last errors are kept meanwhile
+        try:
+            self.live_mode_budget = int(
+                self.settings.get('live_mode_budget', 0)
+            )
+        except (ValueError, TypeError):
+            self.live_mode_budget = 0
+
         # set ruler guide based on max line length setting
         self.set_ruler_guide = bool(
             self.settings.get('set_ruler_guide', False)
@@ -188,6 +391,11 @@ class Flake8LintSettings(object):
         # list of python built-in functions (like '_')
         self.builtins = self.settings.get('builtins') or []
 
+        # resolve star imports from project modules with symbol index
+        self.star_import_index = bool(
+            self.settings.get('star_import_index', False)
+        )
+
         # turn on pyflakes error lint
         self.pyflakes = bool(self.settings.get('pyflakes', True))
 
@@ -239,20 +447,42 @@ class Flake8LintSettings(object):
         self.ignore_files = self.settings.get('ignore_files') or []
 
 
-def log(msg, level=None):
+def log(msg, *args, **kwargs):
     """Log to ST python console.
 
     If log level 'debug' (or None) print only if debug setting is enabled.
+    Message is formatted with positional arguments only if it is printed.
     """
-    if level is None:
-        level = 'debug'
+    level = kwargs.get('level') or 'debug'
 
     if level == 'debug' and not settings.debug:
         return
 
+    if args:
+        msg = msg.format(*args)
+
     print("[Flake8Lint {0}] {1}".format(level.upper(), msg))
 
 
+def trace(event, view=None, **fields):
+    """Write lint event to trace file as JSON line if trace file is set."""
+    if not settings.trace_file:
+        return
+
+    fields['time'] = time.time()
+    fields['event'] = event
+    if view is not None:
+        fields['view'] = view.id()
+
+    line = json.dumps(fields, sort_keys=True)
+    with TRACE_LOCK:
+        try:
+            with open(settings.trace_file, 'a') as trace_file:
+                trace_file.write(line + '\n')
+        except (IOError, OSError) as e:
+            log("can't write trace file: {0}", e, level='error')
+
+
 def isspace(symbol):
     """Return `True` if `symbol` is space or tab."""
     return symbol in WHITESPACES
@@ -302,6 +532,16 @@ def filename_match(filename, patterns):
     return False
 
 
+def symbol_index_path(roots):
+    """Return star imports symbol index file path for project roots."""
+    if hasattr(sublime, 'cache_path'):
+        cache_dir = os.path.join(sublime.cache_path(), 'Python Flake8 Lint')
+    else:
+        cache_dir = os.path.join(PLUGIN_DIR, '.cache')
+    digest = hashlib.md5(os.pathsep.join(roots).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, 'symbols-{0}.json'.format(digest))
+
+
 def skip_line_lint(line):
     """Check if we need to skip line check.
 
@@ -320,6 +560,82 @@ def skip_line_lint(line):
     return skip
 
 
+def is_error_shown(error_code, select, ignore):
+    """Check if error code fits in 'select' and 'ignore' settings."""
+    # check if user has a setting for select only errors to show
+    if select and not [c for c in select if error_code.startswith(c)]:
+        return False
+
+    # Pydocstyle's 'D203 1 blank line required before class docstring'
+    # and 'D211 No blank lines allowed before class docstring' are  in
+    # conflict with each other. We need to disable 'D203' by default.
+    # See also:
+    # - https://github.com/PyCQA/pydocstyle/issues/141
+    # - https://hg.python.org/peps/rev/9b715d8246db
+    if error_code == 'D203' and 'D211' not in ignore:
+        return False
+
+    # check if user has a setting for ignore some errors
+    return not [c for c in ignore if error_code.startswith(c)]
+
+
+def cpu_count():
+    """Return number of CPUs or 2 if it is unknown."""
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 2
+
+
+def merge_regions(regions):
+    """Return sorted list of regions with overlapping ones merged."""
+    merged = []
+    for begin, end in sorted(regions):
+        if merged and begin <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((begin, end))
+    return merged
+
+
+class ViewErrors(object):
+    """Errors of view lines.
+
+    Error lines are kept sorted to look for next and previous error line
+    with bisect, status bar texts are joined once.
+    """
+
+    def __init__(self, errors):
+        """Initialize errors index from dict of error texts by line."""
+        self.lines = sorted(errors)
+        self.statuses = dict(
+            (line, u'flake8: {0}'.format(u' / '.join(texts)))
+            for line, texts in errors.items()
+        )
+
+    def status(self, line):
+        """Return status bar text of line or None if line has no errors."""
+        return self.statuses.get(line)
+
+    def next_line(self, line):
+        """Return next error line, wrap around to the first one."""
+        if not self.lines:
+            return None
+        index = bisect.bisect_right(self.lines, line)
+        if index == len(self.lines):
+            index = 0
+        return self.lines[index]
+
+    def previous_line(self, line):
+        """Return previous error line, wrap around to the last one."""
+        if not self.lines:
+            return None
+        index = bisect.bisect_left(self.lines, line)
+        return self.lines[index - 1]
+
+
 class SublimeStatusBar(object):
     """Update Sublime statusbar functions.
 
@@ -343,10 +659,10 @@ class SublimeStatusBar(object):
         if current_line is None:
             return
 
-        if current_line in view_errors:
+        status = view_errors.status(current_line)
+        if status is not None:
             # there is an error on current line
-            errors = view_errors[current_line]
-            view.set_status('flake8-tip', 'flake8: %s' % ' / '.join(errors))
+            view.set_status('flake8-tip', status)
         else:
             # no errors - clear statusbar
             SublimeStatusBar.clear(view)
@@ -371,10 +687,20 @@ class SublimeView(object):
         - ST plugin settings (global, user, project)
         - flake8 settings (global, project)
         """
+        return SublimeView.file_settings(
+            view.settings().get('flake8lint') or {}, view.file_name()
+        )
+
+    @staticmethod
+    def file_settings(view_settings, filename):
+        """Return dict with file settings.
+
+        View settings are project settings of plugin ('flake8lint'), flake8
+        config is searched from file path up.
+        """
         result = {}
 
         # get settings from global (user) plugin settings
-        view_settings = view.settings().get('flake8lint') or {}
         for param in PROJECT_SETTINGS_KEYS:
             result[param] = view_settings.get(param, getattr(settings, param))
         # this is fallback to setting 'pydocstyle' old name 'pep257'
@@ -386,7 +712,7 @@ class SublimeView(object):
         project_config = result.get('use_flake8_project_config', True)
 
         if global_config or project_config:
-            filename = os.path.abspath(view.file_name())
+            filename = os.path.abspath(filename)
 
             flake8_config = load_flake8_config(filename, global_config,
                                                project_config)
@@ -427,7 +753,327 @@ class SublimeView(object):
             max_line_length = 79
 
         view.settings().set('rulers', [max_line_length])
-        log("view ruler guide is set to {0}".format(max_line_length))
+        log("view ruler guide is set to {0}", max_line_length)
+
+
+class ViewRegions(object):
+    """Error regions of view.
+
+    Overlapping regions of each level are merged. If there are too many of
+    them, only regions around the visible area are painted and active view
+    is watched to paint others when they are scrolled into sight. Regions
+    positions are known for the linted text only, so view is not repainted
+    after it was modified: Sublime Text moves painted regions itself.
+    """
+
+    def __init__(self, view, levels):
+        """Initialize regions.
+
+        Levels is a list of (level, regions, scope, icon, flags) tuples.
+        """
+        self.view = view
+        self.levels = []
+        self.count = 0
+        for level, regions, scope, icon, flags in levels:
+            regions = merge_regions(regions)
+            self.count += len(regions)
+            self.levels.append((
+                'flake8lint-{0}'.format(level),
+                regions,
+                [region[0] for region in regions],
+                [region[1] for region in regions],
+                scope, icon, flags
+            ))
+        self.painted = None
+        self.watching = False
+        self.modified = False
+
+    def paint(self):
+        """Paint regions, return True if view needs to be watched."""
+        if self.count <= REGIONS_PAINT_LIMIT:
+            for key, regions, __, __, scope, icon, flags in self.levels:
+                self.view.add_regions(
+                    key, [sublime.Region(*region) for region in regions],
+                    scope, icon, flags
+                )
+            return False
+
+        visible = self.view.visible_region()
+        if self.painted is not None and (
+            self.painted[0] <= visible.begin() and
+            visible.end() <= self.painted[1]
+        ):
+            return True  # visible area is painted already
+
+        first_row = self.view.rowcol(visible.begin())[0]
+        last_row = self.view.rowcol(visible.end())[0]
+        begin = self.view.text_point(
+            max(first_row - REGIONS_MARGIN_LINES, 0), 0
+        )
+        end = self.view.text_point(last_row + REGIONS_MARGIN_LINES, 0)
+
+        log("paint regions between {0} and {1}", begin, end)
+        for key, regions, begins, ends, scope, icon, flags in self.levels:
+            first = bisect.bisect_left(ends, begin)
+            last = bisect.bisect_right(begins, end)
+            self.view.add_regions(
+                key,
+                [sublime.Region(*region) for region in regions[first:last]],
+                scope, icon, flags
+            )
+        self.painted = (begin, end)
+        return True
+
+    def watch(self):
+        """Paint regions coming into sight while view is scrolled."""
+        if self.watching or self.modified:
+            return
+        if self.count <= REGIONS_PAINT_LIMIT:
+            return  # all regions are painted
+
+        view_id = self.view.id()
+        self.watching = True
+
+        def poll():
+            """Repaint regions until view is inactive, modified or closed."""
+            if REGIONS_IN_VIEWS.peek(view_id) is not self or self.modified:
+                self.watching = False
+                return
+            window = self.view.window()
+            if window is None:
+                self.watching = False
+                REGIONS_IN_VIEWS.pop(view_id, None)
+                return
+            active_view = window.active_view()
+            if active_view is None or active_view.id() != view_id:
+                log("stop watching inactive view regions")
+                self.watching = False
+                return
+            self.paint()
+            sublime.set_timeout(poll, REGIONS_POLL_DELAY)
+
+        sublime.set_timeout(poll, REGIONS_POLL_DELAY)
+
+
+class ErrorsPanel(object):
+    """Quick panel with lint errors.
+
+    Errors are formatted only when they are shown. Long errors lists are
+    grouped by error code and every group is shown page by page.
+    """
+
+    def __init__(self, view, errors):
+        """Initialize panel.
+
+        Errors is a list of (error, line text) tuples.
+        """
+        self.view = view
+        self.errors = errors
+
+    def show(self):
+        """Show errors or error codes if there are too many errors."""
+        if len(self.errors) <= QUICK_PANEL_LIMIT:
+            self.show_errors(self.errors)
+        else:
+            self.show_codes()
+
+    def show_panel(self, items, on_done, deferred=False):
+        """Show quick panel in view window."""
+        window = self.view.window()
+        if not window:
+            return
+
+        if deferred:
+            # quick panel can't be opened right from quick panel callback
+            sublime.set_timeout(
+                lambda: window.show_quick_panel(items, on_done), 10
+            )
+        else:
+            window.show_quick_panel(items, on_done)
+
+    def show_codes(self, deferred=False):
+        """Show error codes with errors count."""
+        log("show flake8 lint error codes")
+
+        groups = {}
+        for entry in self.errors:
+            code = entry[0][2].split(' ', 1)[0]
+            groups.setdefault(code, []).append(entry)
+        codes = sorted(groups, key=lambda code: (-len(groups[code]), code))
+
+        items = []
+        for code in codes:
+            error = groups[code][0][0]
+            items.append([
+                u'{0}: {1} errors'.format(code, len(groups[code])),
+                error[2].split(' ', 1)[-1],
+            ])
+
+        def code_selected(index):
+            """Code was selected - show its errors."""
+            if index == -1:
+                log("close errors popup window")
+                return
+            self.show_errors(groups[codes[index]], grouped=True,
+                             deferred=True)
+
+        self.show_panel(items, code_selected, deferred=deferred)
+
+    def show_errors(self, errors, page=0, grouped=False, deferred=False):
+        """Show one page of errors."""
+        log("show flake8 lint errors (page {0})", page)
+
+        first = page * QUICK_PANEL_PAGE
+        shown = errors[first:first + QUICK_PANEL_PAGE]
+        items = [
+            [error[2], u'{0}: {1}'.format(error[0], line_text.strip())]
+            for error, line_text in shown
+        ]
+
+        actions = []
+        if first + QUICK_PANEL_PAGE < len(errors):
+            items.append([
+                'Next page',
+                'errors {0}-{1} of {2}'.format(
+                    first + QUICK_PANEL_PAGE + 1,
+                    min(first + 2 * QUICK_PANEL_PAGE, len(errors)),
+                    len(errors)
+                ),
+            ])
+            actions.append(lambda: self.show_errors(
+                errors, page + 1, grouped, deferred=True
+            ))
+        if page:
+            items.append([
+                'Previous page',
+                'errors {0}-{1} of {2}'.format(
+                    first - QUICK_PANEL_PAGE + 1, first, len(errors)
+                ),
+            ])
+            actions.append(lambda: self.show_errors(
+                errors, page - 1, grouped, deferred=True
+            ))
+        if grouped:
+            items.append(['Back', 'all error codes'])
+            actions.append(lambda: self.show_codes(deferred=True))
+
+        def error_selected(index):
+            """Error or page was selected."""
+            if index == -1:
+                log("close errors popup window")
+            elif index < len(shown):
+                self.error_selected(shown[index][0])
+            else:
+                actions[index - len(shown)]()
+
+        self.show_panel(items, error_selected, deferred=deferred)
+
+    def error_selected(self, error):
+        """Error was selected - go to error."""
+        log("error was selected from popup window: scroll to line")
+
+        # get error region
+        region_begin = self.view.text_point(error[0] - 1, error[1])
+
+        # go to error
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(region_begin, region_begin))
+
+        self.view.window().focus_view(self.view)
+        self.view.show_at_center(region_begin)
+
+        # work around sublime bug with caret position not refreshing
+        # see also: https://github.com/SublimeTextIssues/Core/issues/485
+        bug_key = 'selection_bug_demo_workaround_regions_key'
+        self.view.add_regions(bug_key, [], 'no_scope', '', sublime.HIDDEN)
+        self.view.erase_regions(bug_key)
+
+        SublimeStatusBar.update(self.view)
+
+
+class LiveMode(object):
+    """Live mode lint functions.
+
+    This is dummy class: simply group all live mode methods together.
+    """
+
+    @staticmethod
+    def is_enabled(view_settings, key):
+        """Check if checker setting is turned on."""
+        if key != 'complexity':
+            return bool(view_settings.get(key))
+        try:
+            return int(view_settings.get(key, -1)) > -1
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def plan(view_settings, costs, budget):
+        """Split phases of enabled checkers by their costs (in seconds).
+
+        Return (live, deferred, dropped) sets of phases. Cheapest phases
+        which fit in budget together are live, phases which fit in budget
+        alone are deferred, others are dropped. Phases not measured yet are
+        live to measure them.
+        """
+        enabled = [
+            phase for phase, keys in CHECKERS_PHASES
+            if any(LiveMode.is_enabled(view_settings, key) for key in keys)
+        ]
+        enabled.sort(key=lambda phase: costs.get(phase, 0.0))
+
+        live, deferred, dropped = set(), set(), set()
+        spent = costs.get('parse', 0.0)
+        for phase in enabled:
+            cost = costs.get(phase)
+            if cost is None:
+                live.add(phase)
+            elif cost > budget:
+                dropped.add(phase)
+            elif spent + cost <= budget:
+                live.add(phase)
+                spent += cost
+            else:
+                deferred.add(phase)
+
+        # import order and complexity checkers are fed by AST checkers walk
+        for phase in ('import order', 'complexity'):
+            if 'ast checkers' in dropped:
+                target = dropped
+            elif 'ast checkers' in deferred:
+                target = deferred
+            else:
+                continue
+            for phases in (live, deferred):
+                if phase in phases:
+                    phases.remove(phase)
+                    target.add(phase)
+
+        return live, deferred, dropped
+
+    @staticmethod
+    def kept_errors(errors_list, phases):
+        """Return errors reported by checkers of given phases."""
+        prefixes = tuple(
+            prefix
+            for phase, codes in PHASES_CODES if phase in phases
+            for prefix in codes
+        )
+        if not prefixes:
+            return []
+        return [error for error in errors_list
+                if error[2].startswith(prefixes)]
+
+    @staticmethod
+    def view_settings(view_settings, phases):
+        """Return view settings with checkers of given phases only."""
+        result = dict(view_settings)
+        for phase, keys in CHECKERS_PHASES:
+            if phase in phases:
+                continue
+            for key in keys:
+                result[key] = -1 if key == 'complexity' else False
+        return result
 
 
 class LintReport(object):
@@ -478,7 +1124,7 @@ class LintReport(object):
         elif mark_type.startswith('theme-'):
             theme = mark_type[6:]
             if theme not in ('alpha', 'bright', 'dark', 'hard', 'simple'):
-                log("unknown gutter mark theme: '{0}'".format(mark_type))
+                log("unknown gutter mark theme: '{0}'", mark_type)
                 return
 
             # ST does not expect platform specific paths here, but only
@@ -498,10 +1144,10 @@ class LintReport(object):
         self.is_highlight = settings.highlight
         self.is_popup = settings.popup
 
-        log("'select' setting: {0}".format(self.select))
-        log("'ignore' setting: {0}".format(self.ignore))
-        log("'is_highlight' setting: {0}".format(self.is_highlight))
-        log("'is_popup' setting: {0}".format(self.is_popup))
+        log("'select' setting: {0}", self.select)
+        log("'ignore' setting: {0}", self.ignore)
+        log("'is_highlight' setting: {0}", self.is_highlight)
+        log("'is_popup' setting: {0}", self.is_popup)
 
     def error_region(self, full_line_text, line_point, error_msg, error_col):
         """Add error region to regions list."""
@@ -816,7 +1462,7 @@ class LintReport(object):
         errors_list_filtered = []
 
         for error in errors_list:
-            log("error to show: {0}".format(error))
+            log("error to show: {0}", error)
             if error in errors_shown:
                 log("skip error: already shown")
             errors_shown.add(error)
@@ -833,45 +1479,23 @@ class LintReport(object):
 
             # skip line if 'noqa' defined
             if skip_line_lint(line_text):
-                log("skip '{0}' in line {1} due to 'noqa' comment".format(
-                    error_text, error_line
-                ))
+                log("skip '{0}' in line {1} due to 'noqa' comment",
+                    error_text, error_line)
                 continue
 
             # parse error line to get error code
             error_code, __ = error_text.split(' ', 1)
 
-            # check if user has a setting for select only errors to show
-            if self.select:
-                if not [c for c in self.select if error_code.startswith(c)]:
-                    log("error does not fit in 'select' settings")
-                    continue
-
-            # check if user has a setting for ignore some errors
-            if not self.ignore:
-                self.ignore = []
-
-            # Pydocstyle's 'D203 1 blank line required before class docstring'
-            # and 'D211 No blank lines allowed before class docstring' are  in
-            # conflict with each other. We need to disable 'D203' by default.
-            # See also:
-            # - https://github.com/PyCQA/pydocstyle/issues/141
-            # - https://hg.python.org/peps/rev/9b715d8246db
-            if 'D203' not in self.ignore and 'D211' not in self.ignore:
-                self.ignore.append('D203')
-
-            if [c for c in self.ignore if error_code.startswith(c)]:
-                log("error does fit in 'ignore' settings")
+            # check user 'select' and 'ignore' settings
+            if not is_error_shown(error_code, self.select, self.ignore):
+                log("error does not fit in 'select' and 'ignore' settings")
                 continue
 
             # add error to filtered errors list
             errors_list_filtered.append(error)
 
-            # build error text
-            self.errors_to_show.append([
-                error_text,
-                u'{0}: {1}'.format(error_line + 1, line_text.strip()),
-            ])
+            # keep error line text, error is formatted when it is shown
+            self.errors_to_show.append((error, line_text))
 
             # prepare errors regions
             if self.is_highlight or self.gutter_mark:
@@ -890,14 +1514,14 @@ class LintReport(object):
                 else:
                     regions_list = self.regions['warning']
 
-                regions_list.append(sublime.Region(start, end))
+                regions_list.append((start, end))
 
             # save errors for each line in view to special dict
             view_errors.setdefault(error_line, []).append(error_text)
 
         # save errors
         self.errors_list = errors_list_filtered
-        ERRORS_IN_VIEWS[self.view.id()] = view_errors
+        ERRORS_IN_VIEWS[self.view.id()] = ViewErrors(view_errors)
 
     def show_errors(self, quiet=False):
         """Show all errors."""
@@ -913,70 +1537,48 @@ class LintReport(object):
             scope_name = 'invalid.deprecated'
 
         # highlight error regions if defined
+        levels = []
         if self.is_highlight:
             for level in ('warning', 'error', 'critical'):
                 if not self.regions[level]:
                     continue
 
-                log("highlight errors in view (regions: {0})".format(level))
+                log("highlight errors in view (regions: {0})", level)
 
-                self.view.add_regions(
-                    'flake8lint-{0}'.format(level),
+                levels.append((
+                    level,
                     self.regions[level],
                     scope_name.format(level),
                     self.gutter_mark.format(level),
                     sublime.DRAW_OUTLINED
-                )
+                ))
 
         elif self.gutter_mark:
             for level in ('warning', 'error', 'critical'):
                 if not self.regions[level]:
                     continue
 
-                log("highlight errors in view (marks: {0})".format(level))
+                log("highlight errors in view (marks: {0})", level)
 
-                self.view.add_regions(
-                    'flake8lint-{0}'.format(level),
+                levels.append((
+                    level,
                     self.regions[level],
                     scope_name.format('gutter'),
                     self.gutter_mark.format(level),
                     sublime.HIDDEN
-                )
+                ))
+
+        if levels:
+            view_regions = ViewRegions(self.view, levels)
+            REGIONS_IN_VIEWS[self.view.id()] = view_regions
+            if view_regions.paint():
+                log("paint regions around visible area only")
+                view_regions.watch()
 
         if self.is_popup and not quiet:
             log("show popup window with errors")
             # view errors window
-            window = self.view.window()
-            if not window:
-                return
-            window.show_quick_panel(self.errors_to_show, self.error_selected)
-
-    def error_selected(self, item_selected):
-        """Error was selected - go to error."""
-        if item_selected == -1:
-            log("close errors popup window")
-            return
-
-        log("error was selected from popup window: scroll to line")
-
-        # get error region
-        error = self.errors_list[item_selected]
-        region_begin = self.view.text_point(error[0] - 1, error[1])
-
-        # go to error
-        self.view.sel().clear()
-        self.view.sel().add(sublime.Region(region_begin, region_begin))
-
-        self.view.window().focus_view(self.view)
-        self.view.show_at_center(region_begin)
-
-        # work around sublime bug with caret position not refreshing
-        # see also: https://github.com/SublimeTextIssues/Core/issues/485
-        bug_key = 'selection_bug_demo_workaround_regions_key'
-        self.view.add_regions(bug_key, [], 'no_scope', '', sublime.HIDDEN)
-        self.view.erase_regions(bug_key)
-
-        SublimeStatusBar.update(self.view)
+            ErrorsPanel(self.view, self.errors_to_show).show()
 
     def report_success(self, quiet=False):
         """Blink with gutter marks (success report)."""
@@ -1002,49 +1604,233 @@ class LintReport(object):
             )
 
 
-class Flake8Lint(object):
-    """Lint functions.
+class ProjectLint(object):
+    """Lint project files on a pool of external interpreter processes.
 
-    This is dummy class: simply group all lint methods together.
+    Each worker thread runs one external interpreter at a time, so files
+    are linted by as many processes as there are CPUs. Errors of every file
+    are written to output panel as soon as file is linted.
     """
 
-    @staticmethod
-    def wait_and_lint(view):
-        """Set rullers and run file lint after file was loaded."""
-        window = sublime.active_window()
-        if not window:
+    def __init__(self, window, folders, project_settings):
+        """Initialize project lint.
+
+        Project settings are plugin project settings ('flake8lint').
+        """
+        self.window = window
+        self.folders = folders
+        self.project_settings = project_settings
+        self.results = {}
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.files = queue.Queue()
+        self.files_count = 0
+        self.errors_count = 0
+
+        self.panel = self.create_panel()
+
+    def create_panel(self):
+        """Create and show output panel for lint results."""
+        if int(sublime.version()) >= 3000:
+            panel = self.window.create_output_panel(PROJECT_PANEL)
+        else:
+            panel = self.window.get_output_panel(PROJECT_PANEL)
+
+        panel.settings().set('result_file_regex', PROJECT_RESULT_REGEX)
+        panel.settings().set('word_wrap', False)
+        self.window.run_command(
+            'show_panel', {'panel': 'output.{0}'.format(PROJECT_PANEL)}
+        )
+        return panel
+
+    def append(self, text):
+        """Append text to output panel (in main thread) if not cancelled.
+
+        Panel is shared with the next project lint of window, so nothing is
+        written to it after lint was cancelled.
+        """
+        if self.cancelled:
             return
 
-        window_views = (window_view.id() for window_view in window.views())
-        if view.id() not in window_views:  # view is preview
-            # FIXME: that if view will closed while we wait for it?
-            sublime.set_timeout(
-                lambda: Flake8Lint.wait_and_lint(view), 300
+        def callback():
+            """Append text to output panel."""
+            if self.cancelled:
+                return
+            if int(sublime.version()) >= 3000:
+                self.panel.run_command('append', {
+                    'characters': text, 'force': True, 'scroll_to_end': True
+                })
+            else:
+                edit = self.panel.begin_edit()
+                self.panel.insert(edit, self.panel.size(), text)
+                self.panel.end_edit(edit)
+
+        sublime.set_timeout(callback, 0)
+
+    def start(self):
+        """Start project lint in background."""
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+
+    def cancel(self):
+        """Stop project lint, files which are being linted are dropped."""
+        self.cancelled = True
+
+    def find_files(self, folder, file_settings):
+        """Return python files of folder not matched by 'ignore_files'."""
+        patterns = file_settings.get('ignore_files') or []
+        folder_name = folder.rstrip(os.path.sep) + os.path.sep
+
+        for root, dirs, files in os.walk(folder):
+            relative_root = (root + os.path.sep)[len(folder_name):]
+            dirs[:] = sorted(
+                name for name in dirs
+                if not name.startswith('.') and
+                not filename_match(relative_root + name, patterns)
+            )
+            for name in sorted(files):
+                if not name.endswith('.py'):
+                    continue
+                if filename_match(relative_root + name, patterns):
+                    continue
+                yield os.path.join(root, name)
+
+    def run(self):
+        """Find project files and lint them on workers pool."""
+        start_time = time.time()
+        self.append("Flake8 Lint: lint {0}\n".format(
+            ', '.join(self.folders)
+        ))
+
+        for folder in self.folders:
+            # project folder settings with folder flake8 config
+            file_settings = SublimeView.file_settings(
+                self.project_settings, folder
             )
+            try:
+                for filename in self.find_files(folder, file_settings):
+                    if self.cancelled:
+                        return
+                    self.files.put((filename, file_settings))
+                    self.files_count += 1
+            except (TypeError, ValueError):
+                self.append("'ignore_files' option is not a list of file "
+                            "masks\n")
+                return
+
+        interpreter = self.project_settings.get(
+            'python_interpreter', settings.python_interpreter
+        )
+        if not interpreter or interpreter == 'internal':
+            log("project lint needs external interpreter, use default one")
+            interpreter = 'auto'
+        interpreter, linter = Flake8Lint.external_linter(interpreter)
+
+        workers_count = min(cpu_count(), self.files_count)
+        log("lint {0} files in {1} processes", self.files_count,
+            workers_count)
+
+        workers = []
+        for __ in range(workers_count):
+            worker = threading.Thread(target=self.worker,
+                                      args=(interpreter, linter))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+        if self.cancelled:
+            log("project lint was cancelled")
             return
 
-        log("run lint by 'on_load' hook")
-        Flake8Lint.do_lint(view)
+        self.append(
+            "\nDone: {0} errors found in {1} of {2} files ({3:.1f}s)\n".format(
+                self.errors_count,
+                len([errors for errors in self.results.values() if errors]),
+                self.files_count,
+                time.time() - start_time
+            )
+        )
+
+    def worker(self, interpreter, linter):
+        """Lint files from queue until it is empty or lint is cancelled."""
+        while not self.cancelled:
+            try:
+                filename, file_settings = self.files.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                errors = self.lint_file(filename, file_settings,
+                                        interpreter, linter)
+            except (IOError, OSError) as e:
+                log("can't lint file '{0}': {1}", filename, e, level='error')
+                continue
+            if self.cancelled:
+                return
+            self.add_result(filename, errors)
+
+    def lint_file(self, filename, file_settings, interpreter, linter):
+        """Lint file and return errors to show."""
+        with io.open(filename, 'rb') as source_file:
+            lines = source_file.read().decode('utf-8', 'replace')
+
+        # skip file check if 'noqa' for whole file is set
+        if FLAKE8_NOQA(lines) is not None:
+            return []
+
+        file_settings = dict(file_settings)
+        file_settings['filename'] = filename
+        errors = lint_external(lines, file_settings, interpreter, linter,
+                               complexity_table=False)
+
+        select = file_settings.get('select') or []
+        ignore = file_settings.get('ignore') or []
+
+        source_lines = lines.splitlines()
+        result = []
+        for error in sorted(set(errors)):
+            line = error[0] - 1
+            if 0 <= line < len(source_lines) and \
+                    skip_line_lint(source_lines[line]):
+                continue
+            if is_error_shown(error[2].split(' ', 1)[0], select, ignore):
+                result.append(error)
+        return result
+
+    def add_result(self, filename, errors):
+        """Save file errors and write them to output panel."""
+        with self.lock:
+            self.results[filename] = errors
+            self.errors_count += len(errors)
+
+        if errors:
+            self.append(u''.join(
+                u'{0}:{1}:{2}: {3}\n'.format(
+                    filename, error[0], error[1] + 1, error[2]
+                )
+                for error in errors
+            ))
+
+
+class Flake8Lint(object):
+    """Lint functions.
+
+    This is dummy class: simply group all lint methods together.
+    """
 
     @staticmethod
-    def on_file_load(view=None, retry=False):
+    def on_file_load(view=None):
         """Run actions on file load.
 
-        Wait until file was finally loaded and run actions if needed.
+        View waits until it is ready: loaded, active and not a preview.
+        Readiness is checked on view events and a few times by timer.
         """
-        set_ruler_guide = settings.set_ruler_guide
-        lint_on_load = settings.lint_on_load
-
-        if not (set_ruler_guide or lint_on_load):
+        if not (settings.set_ruler_guide or settings.lint_on_load):
             return  # no need to do anything
 
-        log("wait until file was loaded")
-        if not retry:  # first run - wait a little bit
-            sublime.set_timeout(
-                lambda: Flake8Lint.on_file_load(view, True), 100
-            )
-            return
-
         if view is None:
             window = sublime.active_window()
             if not window:
@@ -1054,37 +1840,98 @@ class Flake8Lint(object):
             if not view:
                 return
 
-        if view.is_loading():  # view is still running - wait again
-            sublime.set_timeout(
-                lambda: Flake8Lint.on_file_load(view, True), 100
-            )
+        if view.id() in PENDING_VIEWS:
+            log("view is waiting for load already")
             return
 
-        if view.window() is None:  # view window is not initialized - wait...
-            sublime.set_timeout(
-                lambda: Flake8Lint.on_file_load(view, True), 100
-            )
+        log("wait until file was loaded")
+        PENDING_VIEWS[view.id()] = {
+            'retries': LOAD_RETRIES, 'timer': False, 'ruler': False
+        }
+        Flake8Lint.check_file_load(view)
+
+    @staticmethod
+    def check_file_load(view, retry=False):
+        """Run actions on file load if view is ready."""
+        pending = PENDING_VIEWS.get(view.id())
+        if pending is None:
+            return  # view is not waiting for load
+
+        if retry:
+            pending['timer'] = False
+        else:  # view event - timer may wait again
+            pending['retries'] = LOAD_RETRIES
+
+        window = view.window()
+        if view.is_loading() or window is None:
+            # view is still loading or view window is not initialized
+            Flake8Lint.wait_file_load(view, pending)
             return
 
-        if view.window().active_view().id() != view.id():
-            log("view is not active anymore, forget about lint")
-            return  # not active anymore, don't lint it!
+        active_view = window.active_view()
+        if active_view is None or active_view.id() != view.id():
+            log("view is not active, wait until it is activated")
+            return
 
-        if set_ruler_guide:
-            SublimeView.set_ruler_guide(view)
-        else:
-            log("do not set ruler guide due to plugin settings")
+        if not pending['ruler']:
+            pending['ruler'] = True
+            if settings.set_ruler_guide:
+                SublimeView.set_ruler_guide(view)
+            else:
+                log("do not set ruler guide due to plugin settings")
 
-        if lint_on_load:
-            Flake8Lint.wait_and_lint(view)
-        else:
+        if not settings.lint_on_load:
             log("skip lint by 'on_load' hook due to plugin settings")
+            PENDING_VIEWS.pop(view.id(), None)
+            return
+
+        window_views = (window_view.id() for window_view in window.views())
+        if view.id() not in window_views:  # view is preview
+            Flake8Lint.wait_file_load(view, pending)
+            return
+
+        PENDING_VIEWS.pop(view.id(), None)
+        log("run lint by 'on_load' hook")
+        Flake8Lint.do_lint(view)
+
+    @staticmethod
+    def wait_file_load(view, pending):
+        """Check view readiness again later."""
+        if pending['timer']:
+            return  # timer is set already
+
+        if not pending['retries']:
+            log("view is not ready, wait until it is activated")
+            return
+
+        pending['retries'] -= 1
+        pending['timer'] = True
+        sublime.set_timeout(
+            lambda: Flake8Lint.check_file_load(view, retry=True),
+            LOAD_RETRY_DELAY
+        )
+
+    @staticmethod
+    def forget(view):
+        """Forget everything about closed view."""
+        log("forget closed view")
+        ERRORS_IN_VIEWS.pop(view.id(), None)
+        REGIONS_IN_VIEWS.pop(view.id(), None)
+        PENDING_VIEWS.pop(view.id(), None)
+        DISABLED_VIEWS.discard(view.id())
+        LINT_TIMINGS.forget(view.id())
+        LINT_RESULTS.pop(view.id())
+
+        filename = view.file_name()
+        if filename:
+            forget_complexity_table(os.path.abspath(filename))
 
     @staticmethod
     def cleanup(view):
         """Clear regions and statusbar."""
         # cleanup errors in cache
         ERRORS_IN_VIEWS.pop(view.id(), None)
+        REGIONS_IN_VIEWS.pop(view.id(), None)
 
         # we need to always clear regions. three situations here:
         # - we need to clear regions with fixed previous errors
@@ -1097,8 +1944,12 @@ class Flake8Lint(object):
         view.erase_status('flake8-tip')
 
     @staticmethod
-    def do_lint(view, quiet=False):
-        """Do view lint."""
+    def do_lint(view, quiet=False, live_mode=None):
+        """Do view lint.
+
+        Live mode lint ('pause' or 'idle') runs checkers which fit in live
+        mode time budget on typing pause, and deferred checkers too on idle.
+        """
         log("run flake8 lint")
 
         if view.id() in DISABLED_VIEWS:
@@ -1128,11 +1979,12 @@ class Flake8Lint(object):
             return
 
         # get view settings
+        stopwatch = Stopwatch({})
         view_settings = SublimeView.view_settings(view)
 
         # skip files by pattern
         patterns = view_settings.get('ignore_files')
-        log("ignore file patterns: {0}".format(patterns))
+        log("ignore file patterns: {0}", patterns)
         if patterns:
             # add file basename to check list
             paths = [os.path.basename(filename)]
@@ -1155,21 +2007,113 @@ class Flake8Lint(object):
                     "'ignore_files' option is not a list of file masks"
                 )
 
+        view_settings['filename'] = filename
+
+        # resolve star imports with project modules symbol index, one index
+        # per project: relative imports are resolved by file name
+        window = view.window() or sublime.active_window()
+        roots = list(window.folders()) if window else []
+        if view_settings.get('star_import_index') and roots:
+            log("star imports symbol index roots: {0}", roots)
+            view_settings['symbol_index_roots'] = roots
+            view_settings['symbol_index_path'] = symbol_index_path(roots)
+
         if int(sublime.version()) >= 3000:
             set_timeout = sublime.set_timeout_async
         else:
             set_timeout = sublime.set_timeout
 
+        skipped = None
+        if live_mode and settings.live_mode_budget > 0:
+            view_settings, skipped = Flake8Lint.live_mode_settings(
+                view, view_settings, live_mode
+            )
+            if view_settings is None:
+                return
+
+        stopwatch.lap('config')
+        timings = stopwatch.timings
+
+        trace('lint scheduled', view, filename=filename, quiet=quiet)
         set_timeout(
-            lambda: Flake8Lint.async_lint(view, view_settings, quiet=quiet), 0
+            lambda: Flake8Lint.async_lint(view, view_settings, quiet=quiet,
+                                          timings=timings, skipped=skipped),
+            0
         )
 
     @staticmethod
-    def async_lint(view, view_settings, quiet=False):
-        """Do view lint asynchronously."""
+    def live_mode_settings(view, view_settings, live_mode):
+        """Return view settings for live mode lint and skipped phases.
+
+        View settings are None if lint should be skipped.
+        """
+        costs = dict(
+            (phase, p50)
+            for phase, __, p50, __ in LINT_TIMINGS.report(view.id())
+        )
+        live, deferred, dropped = LiveMode.plan(
+            view_settings, costs, settings.live_mode_budget / 1000.0
+        )
+        log("live mode checkers: {0}, deferred: {1}, dropped: {2}",
+            sorted(live), sorted(deferred), sorted(dropped))
+
+        if live_mode != 'idle':
+            return (LiveMode.view_settings(view_settings, live),
+                    deferred | dropped)
+
+        if not deferred:
+            log("skip idle lint: no deferred checkers")
+            return None, dropped
+        return LiveMode.view_settings(view_settings, live | deferred), dropped
+
+    @staticmethod
+    def external_linter(interpreter):
+        """Return external python interpreter and linter script paths."""
+        if interpreter == 'auto':
+            if os.name == 'nt':
+                interpreter = 'pythonw'
+            else:
+                interpreter = 'python'
+            log("guess interpreter: '{0}'", interpreter)
+        elif not os.path.exists(interpreter):
+            sublime.error_message(
+                "Python Flake8 Lint error:\n"
+                "python interpreter '%s' is not found" % interpreter
+            )
+
+        # build linter path for Packages Manager installation
+        linter = os.path.join(PLUGIN_DIR, 'lint.py')
+        log("linter file: {0}", linter)
+
+        # build linter path for installation from git
+        if not os.path.exists(linter):
+            linter = os.path.join(
+                sublime.packages_path(), 'Python Flake8 Lint', 'lint.py')
+            log("linter is not exists, try this: {0}", linter)
+
+        if not os.path.exists(linter):
+            sublime.error_message(
+                "Python Flake8 Lint error:\n"
+                "sorry, can't find correct plugin path"
+            )
+
+        return interpreter, linter
+
+    @staticmethod
+    def async_lint(view, view_settings, quiet=False, timings=None,
+                   skipped=None):
+        """Do view lint asynchronously.
+
+        Lint phases durations are added to 'timings' dict and to view lint
+        timings statistics. Errors of 'skipped' phases are kept from the
+        previous lint.
+        """
+        if timings is None:
+            timings = {}
+
         # try to get interpreter
         interpreter = view_settings.get('python_interpreter', 'auto')
-        log("python interpreter: {0}".format(interpreter))
+        log("python interpreter: {0}", interpreter)
 
         lines = view.substr(sublime.Region(0, view.size()))
 
@@ -1180,57 +2124,53 @@ class Flake8Lint(object):
             return
 
         start_time = time.time()
+        trace('lint started', view, filename=view_settings.get('filename'),
+              interpreter=interpreter, size=len(lines))
         if not interpreter or interpreter == 'internal':
             # if interpreter is Sublime Text internal python - lint file
             log("interpreter is internal")
-            errors_list = lint(lines, view_settings)
+            errors_list = lint(lines, view_settings, timings)
         else:
             # else - check interpreter
             log("interpreter is external")
-            if interpreter == 'auto':
-                if os.name == 'nt':
-                    interpreter = 'pythonw'
-                else:
-                    interpreter = 'python'
-                log("guess interpreter: '{0}'".format(interpreter))
-            elif not os.path.exists(interpreter):
-                sublime.error_message(
-                    "Python Flake8 Lint error:\n"
-                    "python interpreter '%s' is not found" % interpreter
-                )
-
-            # build linter path for Packages Manager installation
-            linter = os.path.join(PLUGIN_DIR, 'lint.py')
-            log("linter file: {0}".format(linter))
-
-            # build linter path for installation from git
-            if not os.path.exists(linter):
-                linter = os.path.join(
-                    sublime.packages_path(), 'Python Flake8 Lint', 'lint.py')
-                log("linter is not exists, try this: {0}".format(linter))
-
-            if not os.path.exists(linter):
-                sublime.error_message(
-                    "Python Flake8 Lint error:\n"
-                    "sorry, can't find correct plugin path"
-                )
+            interpreter, linter = Flake8Lint.external_linter(interpreter)
 
             # and lint file in subprocess
             log("interpreter is external")
             errors_list = lint_external(lines, view_settings,
-                                        interpreter, linter)
+                                        interpreter, linter, timings)
 
         if not errors_list:
             errors_list = []
 
+        if skipped:
+            kept_errors = LiveMode.kept_errors(
+                LINT_RESULTS.get(view.id()) or [], skipped
+            )
+            log("keep {0} errors of skipped checkers", len(kept_errors))
+            errors_list = sorted(
+                set(errors_list).union(kept_errors),
+                key=lambda error: (error[0], error[1] or 0)
+            )
+        LINT_RESULTS[view.id()] = errors_list
+
         lint_time = time.time() - start_time
-        log("lint time: {0:.3f}ms".format(lint_time))
-        log("lint errors found: {0}".format(len(errors_list)))
+        timings['lint'] = lint_time
+        log("lint time: {0:.3f}ms", lint_time * 1000)
+        log("lint errors found: {0}", len(errors_list))
+        trace('lint finished', view, duration=lint_time,
+              errors=len(errors_list))
 
+        start_time = time.time()
         # clean regions and statusbar
         Flake8Lint.cleanup(view)
         # show errors
-        LintReport(view, errors_list, view_settings, quiet=quiet)
+        report = LintReport(view, errors_list, view_settings, quiet=quiet)
+        timings['report'] = time.time() - start_time
+        trace('report shown', view, duration=timings['report'],
+              errors=len(report.errors_list))
+
+        LINT_TIMINGS.add(view.id(), timings)
 
 
 class Flake8DisableCommand(sublime_plugin.TextCommand):
@@ -1245,9 +2185,11 @@ class Flake8DisableCommand(sublime_plugin.TextCommand):
 class Flake8NextErrorCommand(sublime_plugin.TextCommand):
     """Jump to next lint error command."""
 
+    direction = 'next'
+
     def run(self, edit):
         """Jump to next lint error."""
-        log("jump to next lint error")
+        log("jump to {0} lint error", self.direction)
 
         if self.view.id() in DISABLED_VIEWS:
             log("view lint is disabled")
@@ -1256,7 +2198,7 @@ class Flake8NextErrorCommand(sublime_plugin.TextCommand):
             DISABLED_VIEWS.remove(self.view.id())
 
         view_errors = ERRORS_IN_VIEWS.get(self.view.id())
-        if not view_errors:
+        if not view_errors or not view_errors.lines:
             log("no view errors found")
             return
 
@@ -1269,21 +2211,142 @@ class Flake8NextErrorCommand(sublime_plugin.TextCommand):
         if current_line is None:
             return
 
-        next_line = None
-        for i, error_line in enumerate(sorted(view_errors.keys())):
-            if i == 0:
-                next_line = error_line
-            if error_line > current_line:
-                next_line = error_line
-                break
+        error_line = self.find_line(view_errors, current_line)
 
-        log("jump to line {0}".format(next_line))
+        log("jump to line {0}", error_line)
 
-        point = self.view.text_point(next_line, 0)
+        point = self.view.text_point(error_line, 0)
         self.view.sel().clear()
         self.view.sel().add(sublime.Region(point))
         self.view.show(point)
 
+    def find_line(self, view_errors, current_line):
+        """Return error line to jump to."""
+        return view_errors.next_line(current_line)
+
+
+class Flake8PreviousErrorCommand(Flake8NextErrorCommand):
+    """Jump to previous lint error command."""
+
+    direction = 'previous'
+
+    def find_line(self, view_errors, current_line):
+        """Return error line to jump to."""
+        return view_errors.previous_line(current_line)
+
+
+class Flake8ComplexityCommand(sublime_plugin.TextCommand):
+    """Show most complex functions command."""
+
+    def run(self, edit):
+        """Show functions complexity table of the last lint."""
+        log("show most complex functions")
+
+        filename = self.view.file_name()
+        table = complexity_table(os.path.abspath(filename)) if filename else []
+        if not table:
+            sublime.message_dialog(
+                "Flake8 Lint: no complexity data for this file.\n"
+                "Enable 'complexity' setting and lint the file."
+            )
+            return
+
+        window = self.view.window()
+        if not window:
+            return
+
+        items = []
+        for line, name, complexity, exact in table:
+            if not exact:
+                complexity = '>{0}'.format(complexity - 1)
+            items.append([
+                name,
+                'line {0}: complexity {1}'.format(line, complexity),
+            ])
+
+        window.show_quick_panel(
+            items, lambda index: self.function_selected(table, index)
+        )
+
+    def function_selected(self, table, index):
+        """Function was selected - go to function."""
+        if index == -1:
+            return
+
+        point = self.view.text_point(table[index][0] - 1, 0)
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(point))
+        self.view.show_at_center(point)
+
+
+class Flake8PerformanceCommand(sublime_plugin.TextCommand):
+    """Show lint performance report command."""
+
+    def run(self, edit):
+        """Show lint phases durations of the session and of the view."""
+        log("show lint performance report")
+
+        table = LINT_TIMINGS.report()
+        if not table:
+            sublime.message_dialog(
+                "Flake8 Lint: no lint timings yet.\n"
+                "Lint some files to collect them."
+            )
+            return
+
+        window = self.view.window()
+        if not window:
+            return
+
+        view_table = dict(
+            (row[0], row) for row in LINT_TIMINGS.report(self.view.id())
+        )
+        row_format = u'{0}: p50 {1:.1f}ms, p95 {2:.1f}ms ({3} lints)'
+
+        items = []
+        for phase, count, p50, p95 in table:
+            row = view_table.get(phase)
+            if row is None:
+                view_text = 'this file: no data'
+            else:
+                view_text = row_format.format(
+                    'this file', row[2] * 1000, row[3] * 1000, row[1]
+                )
+            items.append([
+                phase,
+                row_format.format('session', p50 * 1000, p95 * 1000, count),
+                view_text,
+            ])
+
+        window.show_quick_panel(items, lambda index: None)
+
+
+class Flake8LintProjectCommand(sublime_plugin.WindowCommand):
+    """Do flake8 lint on all python files of project folders."""
+
+    def run(self):
+        """Run project lint."""
+        folders = self.window.folders()
+        if not folders:
+            sublime.message_dialog("Flake8 Lint: no project folders.")
+            return
+
+        previous_lint = PROJECT_LINTS.pop(self.window.id(), None)
+        if previous_lint is not None:
+            log("cancel previous project lint")
+            previous_lint.cancel()
+
+        # project settings of plugin are in every view settings
+        view = self.window.active_view()
+        project_settings = {}
+        if view is not None:
+            project_settings = view.settings().get('flake8lint') or {}
+
+        log("run project lint")
+        project_lint = ProjectLint(self.window, folders, project_settings)
+        PROJECT_LINTS[self.window.id()] = project_lint
+        project_lint.start()
+
 
 class Flake8LintCommand(sublime_plugin.TextCommand):
     """Do flake8 lint on current file."""
@@ -1311,13 +2374,42 @@ class Flake8LintBackground(sublime_plugin.EventListener):
 
         if int(sublime.version()) >= 3000:
             self.set_timeout = sublime.set_timeout_async
+            self.async_events = True
         else:
             self.set_timeout = sublime.set_timeout
+            self.async_events = False
 
     def on_load(self, view):
+        """Do lint on file load (Sublime Text 2)."""
+        if not self.async_events:
+            Flake8Lint.on_file_load(view)
+
+    def on_load_async(self, view):
         """Do lint on file load."""
         Flake8Lint.on_file_load(view)
 
+    def on_activated(self, view):
+        """View was activated (Sublime Text 2)."""
+        if not self.async_events:
+            self.view_activated(view)
+
+    def on_activated_async(self, view):
+        """View was activated."""
+        self.view_activated(view)
+
+    def view_activated(self, view):
+        """Check if view waiting for load is ready, watch view regions."""
+        Flake8Lint.check_file_load(view)
+
+        view_regions = REGIONS_IN_VIEWS.peek(view.id())
+        if view_regions is not None:
+            view_regions.watch()
+
+    def on_close(self, view):
+        """Forget closed view."""
+        self._latest_keypresses.pop(view.id(), None)
+        Flake8Lint.forget(view)
+
     def on_post_save(self, view):
         """Do lint on file save."""
         if view.is_scratch():
@@ -1349,6 +2441,11 @@ class Flake8LintBackground(sublime_plugin.EventListener):
 
     def on_modified(self, view):
         """View was modified: run delayed lint if needed."""
+        # regions positions are not valid anymore, do not repaint them
+        view_regions = REGIONS_IN_VIEWS.peek(view.id())
+        if view_regions is not None:
+            view_regions.modified = True
+
         if settings.live_mode:
             self.delayed_lint(view)
 
@@ -1365,9 +2462,23 @@ class Flake8LintBackground(sublime_plugin.EventListener):
             """
             if self._latest_keypresses.get(view_id, None) == keypress_time:
                 log("run delayed lint (live_mode)")
-                Flake8Lint.do_lint(view, quiet=True)
+                Flake8Lint.do_lint(view, quiet=True, live_mode='pause')
+
+        def idle_callback():
+            """Live mode idle callback.
+
+            Run lint with deferred checkers if no key pressed for a while.
+            """
+            if self._latest_keypresses.get(view_id, None) == keypress_time:
+                log("run idle lint (live_mode)")
+                Flake8Lint.do_lint(view, quiet=True, live_mode='idle')
 
         self.set_timeout(callback, settings.live_mode_lint_delay)
+        if settings.live_mode_budget > 0:
+            self.set_timeout(
+                idle_callback,
+                settings.live_mode_lint_delay + LIVE_MODE_IDLE_DELAY
+            )
 
 
 def plugin_loaded():
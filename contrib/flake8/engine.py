@@ -11,7 +11,8 @@ import pep8
 from flake8 import __version__
 from flake8 import callbacks
 from flake8.reporter import (multiprocessing, BaseQReport, FileQReport,
-                             QueueReport)
+                             QueueReport, BasePoolReport, FilePoolReport,
+                             PoolReport)
 from flake8 import util
 
 _flake8_noqa = re.compile(r'\s*# flake8[:=]\s*noqa', re.I).search
@@ -88,6 +89,11 @@ def get_parser():
         parser.add_option('-j', '--jobs', type='string', default='auto',
                           help="number of jobs to run simultaneously, "
                           "or 'auto'. This is ignored on Windows.")
+        parser.config_options.append('jobs-pool')
+        parser.add_option('--jobs-pool', action='store_true',
+                          help="check files on a process pool in chunks "
+                          "balanced by file size and report them in a "
+                          "deterministic order (used with --jobs)")
 
     parser.add_option('--exit-zero', action='store_true',
                       help="exit with code 0 even if there are errors")
@@ -173,6 +179,7 @@ class StyleGuide(object):
         except OSError as oserr:
             if oserr.errno in self.serial_retry_errors:
                 self.init_report(pep8.StandardReport)
+                self._styleguide.runner = self._styleguide.input_file
             else:
                 raise
             return func(*args, **kwargs)
@@ -274,7 +281,19 @@ def get_style_guide(**kwargs):
                 n_jobs = multiprocessing.cpu_count()
             except NotImplementedError:
                 n_jobs = 1
-        if n_jobs > 1:
+        if n_jobs > 1 and getattr(options, 'jobs_pool', False):
+            options.jobs = n_jobs
+            reporter = PoolReport
+            if options.quiet:
+                reporter = BasePoolReport
+                if options.quiet == 1:
+                    reporter = FilePoolReport
+            report = styleguide.init_report(reporter)
+            report.input_file = styleguide.input_file
+            # files are only collected while walking the paths,
+            # the report checks them all on the pool when it is stopped
+            styleguide._styleguide.runner = report.add_file
+        elif n_jobs > 1:
             options.jobs = n_jobs
             reporter = QueueReport
             if options.quiet:
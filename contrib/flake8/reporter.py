@@ -3,6 +3,8 @@
 
 import collections
 import errno
+import heapq
+import os
 import re
 import sys
 try:
@@ -12,7 +14,8 @@ except ImportError:     # Python 2.5
 
 import pep8
 
-__all__ = ['multiprocessing', 'BaseQReport', 'QueueReport']
+__all__ = ['multiprocessing', 'BaseQReport', 'QueueReport',
+           'BasePoolReport', 'PoolReport']
 
 
 class BaseQReport(pep8.BaseReport):
@@ -150,3 +153,190 @@ class QueueReport(pep8.StandardReport, BaseQReport):
                 print('    ' + doc.strip())
                 sys.stdout.flush()
         return self.file_errors
+
+
+def _check_chunk(chunk):
+    """Check a chunk of files in a pool worker process."""
+    report = BasePoolReport._worker_report
+    if report is None:
+        # Windows needs to parse again the configuration
+        from flake8.main import get_style_guide, DEFAULT_CONFIG
+        styleguide = get_style_guide(parse_argv=True,
+                                     config_file=DEFAULT_CONFIG)
+        report = BasePoolReport._worker_report = styleguide.options.report
+    return report.check_chunk(chunk)
+
+
+class BasePoolReport(pep8.BaseReport):
+    """Base Process Pool Report.
+
+    Files are only collected while the paths are walked.  When the report
+    is stopped they are split into chunks of roughly the same total size
+    and checked on a pool of worker processes.  Every worker sends back
+    compact per-file results which are reported in the order the files
+    were found, so the output does not depend on the scheduling.
+    """
+    chunks_per_job = 4
+    _worker_report = None
+
+    def __init__(self, options):
+        assert options.jobs > 0
+        super(BasePoolReport, self).__init__(options)
+        self.counters = collections.defaultdict(int)
+        self.n_jobs = options.jobs
+        self.filenames = []
+        self._file_results = []
+        self._show_source = getattr(options, 'show_source', False)
+        self._show_pep8 = getattr(options, 'show_pep8', False)
+
+    def add_file(self, filename):
+        """Collect a file to check, this is the style guide runner."""
+        self.filenames.append(filename)
+
+    def split_chunks(self):
+        """Split collected files into chunks balanced by file size.
+
+        Every chunk is a list of ``(index, filename)`` pairs, where index
+        is the position of the file in the order the files were found.
+        """
+        sizes = []
+        for index, filename in enumerate(self.filenames):
+            try:
+                size = os.path.getsize(filename)
+            except OSError:
+                size = 0
+            sizes.append((-size, index, filename))
+        sizes.sort()
+
+        n_chunks = min(len(sizes), self.n_jobs * self.chunks_per_job)
+        chunks = [[] for i in range(n_chunks)]
+        totals = [(0, i) for i in range(n_chunks)]
+        for size, index, filename in sizes:
+            total, i = heapq.heappop(totals)
+            chunks[i].append((index, filename))
+            heapq.heappush(totals, (total - size, i))
+        return chunks
+
+    def check_chunk(self, chunk):
+        """Check a chunk of files, this runs in a worker process.
+
+        Return a list of ``(index, filename, results)`` tuples along with
+        the state of the report for the whole chunk.
+        """
+        # results are reported by the main process only
+        self.print_filename = False
+        self.total_errors = 0
+        self.counters = collections.defaultdict(int)
+        self.messages = {}
+
+        chunk_results = []
+        for index, filename in chunk:
+            self._file_results = []
+            self.input_file(filename)
+            chunk_results.append(
+                (index, filename, tuple(sorted(self._file_results)))
+            )
+        return chunk_results, self.get_state()
+
+    def error(self, line_number, offset, text, check):
+        """Report an error, according to options."""
+        code = super(BasePoolReport, self).error(line_number, offset,
+                                                 text, check)
+        if code:
+            line = None
+            if self._show_source:
+                if line_number > len(self.lines):
+                    line = ''
+                else:
+                    line = self.lines[line_number - 1]
+            doc = check.__doc__ if self._show_pep8 else None
+            self._file_results.append((
+                self.line_offset + line_number, offset, code, text[5:],
+                line, doc
+            ))
+        return code
+
+    def stop(self):
+        try:
+            self.check_files()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            super(BasePoolReport, self).stop()
+
+    def check_files(self):
+        """Check all collected files on the process pool."""
+        chunks = self.split_chunks()
+        if not chunks:
+            return
+
+        BasePoolReport._worker_report = self
+        pool = multiprocessing.Pool(min(self.n_jobs, len(chunks)))
+        try:
+            pool_results = pool.map(_check_chunk, chunks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+            BasePoolReport._worker_report = None
+
+        files_results = []
+        for chunk_results, state in pool_results:
+            self.update_state(state)
+            files_results.extend(chunk_results)
+
+        for index, filename, results in sorted(files_results):
+            self.report_file(filename, results)
+        sys.stdout.flush()
+
+    def report_file(self, filename, results):
+        """Report the results of a single file checked by a worker."""
+        pass
+
+    def get_state(self):
+        return {'total_errors': self.total_errors,
+                'counters': self.counters,
+                'messages': self.messages}
+
+    def update_state(self, state):
+        self.total_errors += state['total_errors']
+        for key, value in state['counters'].items():
+            self.counters[key] += value
+        self.messages.update(state['messages'])
+
+
+class FilePoolReport(BasePoolReport):
+    """File Process Pool Report."""
+
+    def report_file(self, filename, results):
+        """Print the filename if there are any errors in the file."""
+        if results:
+            print(filename)
+
+
+class PoolReport(BasePoolReport):
+    """Standard Process Pool Report."""
+
+    def __init__(self, options):
+        super(PoolReport, self).__init__(options)
+        self._fmt = pep8.REPORT_FORMAT.get(options.format.lower(),
+                                           options.format)
+        self._repeat = options.repeat
+        self._reported_codes = set()
+
+    def report_file(self, filename, results):
+        """Print the results of a single file."""
+        for row, col, code, text, line, doc in results:
+            if not self._repeat:
+                if code in self._reported_codes:
+                    continue
+                self._reported_codes.add(code)
+            print(self._fmt % {
+                'path': filename,
+                'row': row, 'col': col + 1,
+                'code': code, 'text': text,
+            })
+            if self._show_source:
+                print(line.rstrip())
+                print(re.sub(r'\S', ' ', line[:col]) + '^')
+            if self._show_pep8 and doc:
+                print('    ' + doc.strip())
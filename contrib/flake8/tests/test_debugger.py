@@ -0,0 +1,84 @@
+import unittest
+
+from flake8_debugger import check_code_for_debugger_statements
+
+
+def errors(code):
+    return sorted(
+        (error['line'], error['col'], error['message'])
+        for error in check_code_for_debugger_statements(code)
+    )
+
+
+class TestDebuggerDetector(unittest.TestCase):
+
+    def test_import_alias(self):
+        self.assertEqual(errors('import pdb as p\np.set_trace()\n'), [
+            (1, 0, 'T002 import for pdb found as p'),
+            (2, 0, 'T002 trace method for p found as set_trace'),
+        ])
+
+    def test_trace_method_alias(self):
+        self.assertEqual(errors('from pdb import set_trace as st\nst()\n'), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+            (2, 0, 'T002 trace method for pdb found as st'),
+        ])
+
+    def test_trace_method_alias_only(self):
+        # the trace method is called only under the name it was imported as
+        code = ('from pdb import set_trace as st\n'
+                'obj.set_trace()\n'
+                'set_trace()\n')
+        self.assertEqual(errors(code), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+        ])
+
+    def test_trace_method_import(self):
+        self.assertEqual(errors('from pdb import set_trace\nset_trace()\n'), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+            (2, 0, 'T002 trace method for pdb found as set_trace'),
+        ])
+
+    def test_attribute_receiver(self):
+        self.assertEqual(errors('import pdb\nself.debugger.set_trace()\n'), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+            (2, 0, 'T002 trace method for pdb found as set_trace'),
+        ])
+
+    def test_call_receiver(self):
+        self.assertEqual(errors('import pdb\npdb.Pdb().set_trace()\n'), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+            (2, 0, 'T002 trace method for pdb found as set_trace'),
+        ])
+
+    def test_unknown_receiver(self):
+        code = 'import ipdb\nimport pdb\nfoo.set_trace()\n'
+        self.assertEqual(errors(code), [
+            (1, 0, 'T002 import for ipdb found as ipdb'),
+            (2, 0, 'T002 import for pdb found as pdb'),
+            (3, 0, 'T002 trace method for debugger found as set_trace'),
+        ])
+
+    def test_call_before_import(self):
+        code = 'def f():\n    pdb.set_trace()\nimport pdb\n'
+        self.assertEqual(errors(code), [
+            (2, 4, 'T002 trace method for pdb found as set_trace'),
+            (3, 0, 'T002 import for pdb found as pdb'),
+        ])
+
+    def test_no_debugger_import(self):
+        self.assertEqual(errors('import os\nos.set_trace()\n'), [])
+
+    def test_other_method(self):
+        self.assertEqual(errors("import pdb\npdb.run('x')\n"), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+        ])
+
+    def test_noqa(self):
+        self.assertEqual(errors('import pdb\npdb.set_trace()  # noqa\n'), [
+            (1, 0, 'T002 import for pdb found as pdb'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
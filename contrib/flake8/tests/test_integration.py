@@ -7,7 +7,7 @@ try:
 except ImportError:
     import mock  # < PY33
 
-from flake8 import engine
+from flake8 import engine, reporter
 from flake8.util import is_windows
 
 
@@ -77,3 +77,9 @@ class IntegrationTestCase(unittest.TestCase):
             guide, report = self.check_files(arglist=['--jobs=4'],
                                              explicit_stdin=True,
                                              count=1)
+
+    def test_jobs_pool(self):
+        guide, report = self.check_files(arglist=['--jobs=2', '--jobs-pool'])
+        self.assertEqual(guide.options.jobs, 2)
+        self.assertTrue(isinstance(report, reporter.PoolReport))
+        self.assertEqual(report.counters['files'], 1)
@@ -0,0 +1,286 @@
+import ast
+import sys
+import textwrap
+import unittest
+
+import mccabe
+
+
+IF_ELIF = '''
+def choose(value):
+    if value < 0:
+        return -1
+    elif value == 0:
+        return 0
+    elif value < 10:
+        pass
+    else:
+        return 1
+    if value:
+        value += 1
+    return value
+'''
+
+TRY_EXCEPT = '''
+def load(path):
+    try:
+        data = open(path)
+    except IOError:
+        data = None
+    except (TypeError, ValueError):
+        raise
+    else:
+        data.close()
+    finally:
+        path = None
+    try:
+        pass
+    finally:
+        path = 1
+    return data
+'''
+
+LOOPS = '''
+def search(items, target):
+    for item in items:
+        if item == target:
+            break
+    else:
+        item = None
+    while items:
+        items.pop()
+        if not items:
+            continue
+    else:
+        items = None
+    with open(target) as f:
+        for line in f:
+            pass
+    return item
+'''
+
+NESTED = '''
+def outer(values):
+    def inner(value):
+        if value:
+            return value
+        return None
+
+    def other():
+        pass
+
+    return [inner(value) for value in values if value]
+
+
+class Widget(object):
+    def method(self, x):
+        if x:
+            return x
+        for y in x:
+            pass
+
+    class Inner(object):
+        def method(self):
+            while True:
+                break
+'''
+
+TOP_LEVEL = '''
+if __name__ == '__main__':
+    main()
+elif debug:
+    pass
+
+for name in names:
+    print(name)
+
+while running:
+    if stop:
+        break
+
+try:
+    import json
+except ImportError:
+    json = None
+'''
+
+COMPLEX = '''
+def simple():
+    return 1
+
+
+def complex_function(a, b, c):
+    if a:
+        pass
+    if b:
+        pass
+    if c:
+        pass
+    for x in a:
+        if x:
+            pass
+    while b:
+        pass
+    return c
+'''
+
+
+def graphing_complexities(source):
+    tree = ast.parse(source)
+    visitor = mccabe.PathGraphingAstVisitor()
+    visitor.preorder(tree, visitor)
+    return dict((graph.entity, graph.complexity())
+                for graph in visitor.graphs.values())
+
+
+def counting_complexities(source, threshold=None):
+    tree = ast.parse(source)
+    visitor = mccabe.PathCountingAstVisitor(threshold)
+    visitor.preorder(tree)
+    return dict((graph.entity, graph.complexity())
+                for graph in visitor.graphs.values())
+
+
+class TestPathCountingAstVisitor(unittest.TestCase):
+
+    def assertSameComplexities(self, source):
+        expected = graphing_complexities(source)
+        self.assertTrue(expected)
+        self.assertEqual(counting_complexities(source), expected)
+
+    def test_if_elif(self):
+        self.assertSameComplexities(IF_ELIF)
+
+    def test_try_except(self):
+        self.assertSameComplexities(TRY_EXCEPT)
+
+    def test_loops(self):
+        self.assertSameComplexities(LOOPS)
+
+    def test_nested_functions(self):
+        self.assertSameComplexities(NESTED)
+
+    def test_top_level_blocks(self):
+        self.assertSameComplexities(TOP_LEVEL)
+
+    def test_empty_function(self):
+        self.assertSameComplexities('def f():\n    """Docstring."""\n')
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'new in Python 3.5')
+    def test_async(self):
+        self.assertSameComplexities(textwrap.dedent('''
+            async def fetch(session, urls):
+                async with session:
+                    async for url in urls:
+                        if url:
+                            await session.get(url)
+            '''))
+
+    def test_threshold_stops_walk(self):
+        expected = graphing_complexities(COMPLEX)
+        self.assertEqual(expected['complex_function'], 7)
+
+        tree = ast.parse(COMPLEX)
+        visitor = mccabe.PathCountingAstVisitor(threshold=3)
+        visitor.preorder(tree)
+        graphs = dict((graph.entity, graph)
+                      for graph in visitor.graphs.values())
+
+        simple = graphs['simple']
+        self.assertTrue(simple.exact)
+        self.assertEqual(simple.complexity(), 1)
+
+        # the walk stops as soon as the threshold is exceeded
+        stopped = graphs['complex_function']
+        self.assertFalse(stopped.exact)
+        self.assertEqual(stopped.complexity(), 4)
+
+        visitor.recount(stopped)
+        self.assertTrue(stopped.exact)
+        self.assertEqual(stopped.complexity(), 7)
+
+    def test_checker_reports_real_complexity(self):
+        tree = ast.parse(COMPLEX)
+        checker = mccabe.McCabeChecker(tree, 'stdin', max_complexity=3)
+        errors = [(error[0], error[2]) for error in checker.run()]
+        self.assertEqual(errors, [
+            (6, "C901 'complex_function' is too complex (7)"),
+        ])
+
+    def test_checker_exact_graphs(self):
+        tree = ast.parse(COMPLEX)
+        checker = mccabe.McCabeChecker(tree, 'stdin', max_complexity=3)
+        complexities = dict((graph.entity, graph.complexity())
+                            for graph in checker.get_graphs(exact=True))
+        self.assertEqual(complexities, graphing_complexities(COMPLEX))
+
+
+class TestComplexityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = mccabe.ComplexityCache()
+
+    def complexities(self, source, max_complexity=-1):
+        tree = ast.parse(source)
+        checker = mccabe.McCabeChecker(tree, 'stdin', max_complexity,
+                                       source.split('\n'), self.cache)
+        return dict((graph.entity, graph.complexity())
+                    for graph in checker.get_graphs(exact=True))
+
+    def forge_entries(self, decisions):
+        for key, entry in self.cache.entries.items():
+            self.cache.entries[key] = (decisions,) + entry[1:]
+
+    def test_unchanged_functions_reused(self):
+        self.assertEqual(self.complexities(COMPLEX),
+                         {'simple': 1, 'complex_function': 7})
+        self.assertEqual(len(self.cache.entries), 2)
+        # cached complexities are used instead of walking the functions
+        self.forge_entries(40)
+        self.assertEqual(self.complexities(COMPLEX),
+                         {'simple': 41, 'complex_function': 41})
+
+    def test_changed_function_invalidated(self):
+        self.complexities(COMPLEX)
+        self.forge_entries(40)
+        changed = COMPLEX.replace('    return c\n',
+                                  '    if c:\n        c = 0\n    return c\n')
+        self.assertNotEqual(changed, COMPLEX)
+        # unchanged function is reused even when it is moved
+        self.assertEqual(self.complexities('import os\n' + changed),
+                         {'simple': 41, 'complex_function': 8})
+        self.assertEqual(len(self.cache.entries), 3)
+
+    def test_next_statement_bounds_span(self):
+        self.complexities(COMPLEX + 'x = 1\n')
+        self.forge_entries(40)
+        # a function span ends before the next statement
+        self.assertEqual(self.complexities(COMPLEX + 'x = 2\n'),
+                         {'simple': 41, 'complex_function': 41})
+
+    def test_lower_bound_entries(self):
+        source = COMPLEX
+        tree = ast.parse(source)
+        visitor = mccabe.PathCountingAstVisitor(3, source.split('\n'),
+                                                self.cache)
+        visitor.preorder(tree)
+        entries = sorted(self.cache.entries.values())
+        self.assertEqual(entries, [(0, True, True), (3, True, False)])
+        # exact complexities are counted and cached when they are needed
+        self.assertEqual(self.complexities(source, 3),
+                         {'simple': 1, 'complex_function': 7})
+        self.assertEqual(
+            sorted(self.cache.entries.values()),
+            [(0, True, True), (6, True, True)]
+        )
+        # a lower bound under a higher threshold is walked again
+        self.cache.entries.clear()
+        visitor = mccabe.PathCountingAstVisitor(3, source.split('\n'),
+                                                self.cache)
+        visitor.preorder(tree)
+        self.assertEqual(self.complexities(source, 10),
+                         {'simple': 1, 'complex_function': 7})
+
+
+if __name__ == '__main__':
+    unittest.main()
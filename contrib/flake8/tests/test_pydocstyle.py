@@ -0,0 +1,214 @@
+from __future__ import with_statement
+
+import ast
+import sys
+import textwrap
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # < PY33
+
+import pydocstyle
+from pydocstyle import StringIO
+
+
+def definitions(module):
+    """Return what the checks use of every definition of a module."""
+    return [
+        (type(definition).__name__, definition.name, definition.start,
+         definition.end, definition.docstring, definition.is_public,
+         [decorator.name for decorator in definition.decorators],
+         definition.parent and definition.parent.name)
+        for definition in module
+    ]
+
+
+class TestTreeParser(unittest.TestCase):
+
+    def assertSameDefinitions(self, source, filename='module.py'):
+        source = textwrap.dedent(source)
+        expected = pydocstyle.Parser()(StringIO(source), filename)
+        tree = ast.parse(source)
+        # the module must not be tokenized by `Parser`
+        with mock.patch('pydocstyle.parse') as parse:
+            module = pydocstyle.TreeParser()(StringIO(source), filename, tree)
+            self.assertFalse(parse.called)
+        self.assertEqual(definitions(module), definitions(expected))
+        self.assertEqual(type(module), type(expected))
+        self.assertEqual(module.all, expected.all)
+        self.assertEqual(dict(module.future_imports),
+                         dict(expected.future_imports))
+        return module
+
+    def test_nested_classes(self):
+        self.assertSameDefinitions('''
+            """Module docstring."""
+
+
+            class Outer(object):
+                """Outer docstring."""
+
+                class Inner(object):
+                    """Inner docstring."""
+
+                    class Innermost:
+                        pass
+
+                    def method(self):
+                        """Method docstring."""
+
+                class _Private(object):
+
+                    def method(self):
+                        pass
+
+                def __init__(self):
+                    pass
+
+
+            class _Hidden:
+                class Public:
+                    pass
+            ''')
+
+    def test_decorators(self):
+        self.assertSameDefinitions('''
+            import functools
+
+
+            def decorator(*args):
+                return args
+
+
+            @decorator
+            @decorator('argument', key=(1, 2))
+            class Decorated(object):
+                """Decorated class."""
+
+                @property
+                def value(self):
+                    """Get value."""
+
+                @value.setter
+                def value(self, value):
+                    """Set value."""
+
+                @functools.wraps(decorator)
+                def wrapped(self):
+                    pass
+
+                @staticmethod
+                def one_liner(): pass
+
+
+            @decorator(
+                'multiline arguments',
+            )
+            def function():
+                """Function docstring."""
+            ''')
+
+    def test_all(self):
+        self.assertSameDefinitions('''
+            from __future__ import absolute_import, print_function
+
+            __all__ = ('public', 'Exported', '_exported')
+
+
+            def public():
+                pass
+
+
+            def not_exported():
+                pass
+
+
+            def _exported():
+                pass
+
+
+            class Exported(object):
+                def method(self):
+                    pass
+            ''')
+
+    def test_package(self):
+        self.assertSameDefinitions('''
+            """Package docstring."""
+            __all__ = ('function',)
+
+
+            def function():
+                pass
+            ''', filename='package/__init__.py')
+
+    def test_nested_functions(self):
+        self.assertSameDefinitions('''
+            def outer(argument):
+                """Outer function."""
+                def inner():
+                    """Inner function."""
+                    def innermost():
+                        pass
+                    return innermost
+
+                class Local(object):
+                    def method(self):
+                        pass
+
+                return inner, Local
+
+
+            if True:
+                def conditional():
+                    """Conditional function."""
+            else:
+                def conditional():
+                    pass
+
+            try:
+                def guarded(): pass
+            except ImportError:
+                def guarded():
+                    pass
+            finally:
+                def cleanup():
+                    pass
+            ''')
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'new in Python 3.5')
+    def test_async_functions(self):
+        self.assertSameDefinitions('''
+            class Client(object):
+                async def fetch(self):
+                    """Fetch data."""
+                    async def inner():
+                        pass
+            ''')
+
+    def test_fallback(self):
+        # `__all__` which is mentioned again is left to `Parser`
+        source = textwrap.dedent('''
+            # names which are not in __all__ are private
+            __all__ = ('public',)
+
+
+            def public():
+                pass
+
+
+            def private():
+                pass
+            ''')
+        expected = pydocstyle.Parser()(StringIO(source), 'module.py')
+        with mock.patch('pydocstyle.parse', wraps=pydocstyle.parse) as parse:
+            module = pydocstyle.TreeParser()(StringIO(source), 'module.py',
+                                             ast.parse(source))
+            self.assertTrue(parse.called)
+        self.assertEqual(definitions(module), definitions(expected))
+        self.assertEqual(module.all, expected.all)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -34,3 +34,54 @@ class TestBaseQReport(unittest.TestCase):
         """Test that an ENOENT IOError exception is re-raised."""
         report = ioerror_report_factory(errno.ENOENT)
         self.assertRaises(IOError, report.process_main)
+
+
+def pool_report_factory(jobs=2):
+    options = mock.MagicMock()
+    options.jobs = jobs
+    options.show_source = False
+    options.show_pep8 = False
+    return reporter.BasePoolReport(options)
+
+
+class TestBasePoolReport(unittest.TestCase):
+    def test_split_chunks_by_size(self):
+        """Test that files are split into chunks of the same total size."""
+        report = pool_report_factory(jobs=1)
+        report.chunks_per_job = 2
+        sizes = {'a.py': 10, 'b.py': 70, 'c.py': 40, 'd.py': 30}
+        report.filenames = sorted(sizes)
+        with mock.patch('os.path.getsize', sizes.get):
+            chunks = report.split_chunks()
+        totals = sorted(sum(sizes[f] for __, f in chunk) for chunk in chunks)
+        self.assertEqual(totals, [70, 80])
+
+    def test_split_chunks_keeps_file_index(self):
+        """Test that every file keeps its position in the found order."""
+        report = pool_report_factory(jobs=4)
+        report.filenames = ['missing-%d.py' % i for i in range(5)]
+        chunks = report.split_chunks()
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(
+            sorted(item for chunk in chunks for item in chunk),
+            list(enumerate(report.filenames))
+        )
+
+    def test_check_files_reports_in_found_order(self):
+        """Test that results are reported in the order files were found."""
+        report = pool_report_factory(jobs=2)
+        report.filenames = ['first.py', 'second.py', 'third.py']
+        pool_results = [
+            ([(2, 'third.py', ((1, 0, 'E101', 'text', None, None),))],
+             {'total_errors': 1, 'counters': {'E101': 1}, 'messages': {}}),
+            ([(0, 'first.py', ()), (1, 'second.py', ())],
+             {'total_errors': 0, 'counters': {}, 'messages': {}}),
+        ]
+        reported = []
+        report.report_file = lambda f, results: reported.append(f)
+        with mock.patch('multiprocessing.Pool') as pool:
+            pool.return_value.map.return_value = pool_results
+            report.check_files()
+        self.assertEqual(reported, report.filenames)
+        self.assertEqual(report.total_errors, 1)
+        self.assertEqual(report.counters['E101'], 1)
@@ -0,0 +1,220 @@
+import ast
+import os
+import sys
+import textwrap
+import unittest
+
+# lint.py of the plugin runs the tree plugins in one shared walk
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+import flake8_debugger  # noqa
+import lint  # noqa
+import mccabe  # noqa
+import pep8ext_naming  # noqa
+
+
+SOURCE = textwrap.dedent('''
+    import sys
+    import os
+    from pdb import set_trace as st
+    import ipdb
+
+
+    class badClass(object):
+        def BadMethod(self, BadArg):
+            def nestedFunction(x):
+                if x:
+                    st()
+                for y in x:
+                    if y:
+                        pass
+                    elif y > 1:
+                        pass
+                return [lambda Z: Z for Z in x]
+            return nestedFunction
+
+        class innerClass(Exception):
+            def method(this):
+                try:
+                    ipdb.set_trace()
+                except ValueError:
+                    pass
+                except TypeError:
+                    pass
+                with open(this) as f:
+                    while f:
+                        if f:
+                            break
+                return os, sys
+
+
+    def complex_function(a, b, c):
+        import pdb
+        if a:
+            pdb.set_trace()
+        if b and c:
+            pass
+        for x in a:
+            if x:
+                continue
+        while b:
+            pass
+        return c
+
+
+    if __name__ == '__main__':
+        badVariable = 1
+        for i in range(3):
+            if i:
+                pass
+''')
+
+SETTINGS = {
+    'pep8': False,
+    'pyflakes': False,
+    'pydocstyle': False,
+    'naming': True,
+    'debugger': True,
+    'import_order': True,
+    'import_order_style': 'cryptography',
+    'complexity': 3,
+}
+
+
+def recursive_walk(node, parents=()):
+    """Yield (node, parents) in the order of a recursive preorder walk."""
+    yield node, parents
+    for child in ast.iter_child_nodes(node):
+        for item in recursive_walk(child, parents + (node,)):
+            yield item
+
+
+def postorder(node):
+    """Yield nodes in the order of a recursive postorder walk."""
+    for child in ast.iter_child_nodes(node):
+        for item in postorder(child):
+            yield item
+    yield node
+
+
+class TestTreeWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = ast.parse(SOURCE)
+
+    def test_nodes_order_and_parents(self):
+        walker = lint.TreeWalker()
+        entered = []
+        left = []
+        walker.register(
+            lambda node: entered.append((node, tuple(walker.parents))),
+            left.append
+        )
+        walker.walk(self.tree)
+
+        expected = list(recursive_walk(self.tree))
+        self.assertEqual(len(entered), len(expected))
+        for (node, parents), (expected_node, expected_parents) in zip(
+                entered, expected):
+            self.assertIs(node, expected_node)
+            self.assertEqual([id(parent) for parent in parents],
+                             [id(parent) for parent in expected_parents])
+
+        # every node is left after its children
+        self.assertEqual([id(node) for node in left],
+                         [id(node) for node in postorder(self.tree)])
+
+    def test_node_types(self):
+        walker = lint.TreeWalker()
+        calls = []
+        imports = []
+        walker.register(calls.append, node_types=('Call',))
+        walker.register(imports.append, imports.append,
+                        node_types=('Import', 'ImportFrom'))
+        walker.walk(self.tree)
+
+        nodes = [node for node, _ in recursive_walk(self.tree)]
+        self.assertEqual(
+            calls, [node for node in nodes if isinstance(node, ast.Call)]
+        )
+        # 'enter' and 'leave' handlers of each import in turn
+        self.assertEqual(imports, [
+            node
+            for node in nodes if isinstance(node, (ast.Import, ast.ImportFrom))
+            for _ in range(2)
+        ])
+
+
+class TestSharedWalk(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = ast.parse(SOURCE)
+        lint.COMPLEXITY_CACHE.entries.clear()
+
+    def lint_errors(self, **settings):
+        lint_settings = dict(SETTINGS, **settings)
+        return sorted(lint.lint(SOURCE, lint_settings))
+
+    def plugin_errors(self, checker):
+        return sorted(error[0:3] for error in checker.run())
+
+    def test_naming(self):
+        errors = self.plugin_errors(
+            pep8ext_naming.NamingChecker(self.tree, None)
+        )
+        self.assertTrue(errors)
+        self.assertEqual(
+            [error for error in self.lint_errors() if error[2][0] == 'N'],
+            errors
+        )
+
+    def test_debugger(self):
+        errors = self.plugin_errors(
+            flake8_debugger.DebugStatementChecker(self.tree)
+        )
+        self.assertTrue(errors)
+        self.assertEqual(
+            [error for error in self.lint_errors() if error[2][0] == 'T'],
+            errors
+        )
+
+    def test_import_order(self):
+        errors = self.plugin_errors(
+            lint.ImportOrderLinter(self.tree, None, SOURCE, 'cryptography')
+        )
+        self.assertTrue(errors)
+        self.assertEqual(
+            [error for error in self.lint_errors() if error[2][0] == 'I'],
+            errors
+        )
+
+    def test_complexity(self):
+        errors = self.plugin_errors(
+            mccabe.McCabeChecker(self.tree, None, SETTINGS['complexity'])
+        )
+        self.assertTrue(errors)
+        self.assertEqual(
+            [error for error in self.lint_errors() if error[2][0] == 'C'],
+            errors
+        )
+
+    def test_plugins_together(self):
+        # each plugin reports the same errors with and without the others
+        alone = []
+        for checker in ('naming', 'debugger', 'import_order'):
+            others = dict(
+                (other, other == checker)
+                for other in ('naming', 'debugger', 'import_order')
+            )
+            alone.extend(self.lint_errors(complexity=-1, **others))
+        alone.extend(self.lint_errors(naming=False, debugger=False,
+                                      import_order=False))
+        self.assertEqual(self.lint_errors(), sorted(alone))
+
+
+if __name__ == '__main__':
+    unittest.main()
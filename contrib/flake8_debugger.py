@@ -1,29 +1,35 @@
 import ast
 import tokenize
 
-from sys import stdin
-
 __version__ = '1.4.0'
 
 DEBUGGER_ERROR_CODE = 'T002'
 
+# debugger module -> trace method
+DEBUGGERS = {
+    'pdb': 'set_trace',
+    'ipdb': 'set_trace',
+    'IPython.terminal.embed': 'InteractiveShellEmbed',
+    'IPython.frontend.terminal.embed': 'InteractiveShellEmbed',
+}
+DEBUGGERS_ORDER = (
+    'pdb', 'ipdb', 'IPython.terminal.embed', 'IPython.frontend.terminal.embed',
+)
+
 
 class DebugStatementChecker(object):
     name = 'flake8-debugger'
     version = __version__
 
-    def __init__(self, tree, filename='(none)', builtins=None):
+    def __init__(self, tree, filename='(none)', builtins=None, noqa=()):
         self.tree = tree
-        self.filename = (filename == 'stdin' and stdin) or filename
+        self.filename = filename
+        # lines to skip are given by the caller, flake8 itself skips the
+        # errors on "noqa" lines
+        self.noqa = noqa
 
     def run(self):
-        if self.filename == stdin:
-            noqa = get_noqa_lines(self.filename)
-        else:
-            with open(self.filename, 'r') as file_to_check:
-                noqa = get_noqa_lines(file_to_check.readlines())
-
-        errors = check_tree_for_debugger_statements(self.tree, noqa)
+        errors = check_tree_for_debugger_statements(self.tree, self.noqa)
 
         for error in errors:
             yield (error.get("line"), error.get("col"), error.get("message"), type(self))
@@ -46,96 +52,110 @@ def format_debugger_message(item_type, item_found, name_used):
 
 
 def check_tree_for_debugger_statements(tree, noqa):
-    errors = []
-    debugger_states = {
-        'pdb': {
-            'found': False,
-            'name': None,
-            'trace_method': 'set_trace'
-        },
-        'ipdb': {
-            'found': False,
-            'name': None,
-            'trace_method': 'set_trace'
-        },
-        'IPython.terminal.embed': {
-            'found': False,
-            'name': None,
-            'trace_method': 'InteractiveShellEmbed'
-        },
-        'IPython.frontend.terminal.embed': {
-            'found': False,
-            'name': None,
-            'trace_method': 'InteractiveShellEmbed'
-        }
-    }
+    detector = DebuggerDetector(noqa)
     for node in ast.walk(tree):
-        if isinstance(node, ast.Import) or isinstance(node, ast.ImportFrom):
-            debuggers_found_here = {}
-            for debugger in debugger_states.keys():
-                debuggers_found_here[debugger] = False
+        detector.visit(node)
+    return detector.get_errors()
+
+
+class DebuggerDetector(object):
+    """Find debugger imports and trace method calls in a single walk.
+
+    Nodes may be visited in any order: debugger imports are put into an alias
+    index as they are met, trace method calls are resolved against the index
+    once the walk is over.
+    """
+
+    def __init__(self, noqa=()):
+        self.noqa = frozenset(noqa)
+        self.import_errors = []
+        # debugger module -> name it is imported as
+        self.imported = {}
+        # name a trace method is imported as -> debugger module
+        self.trace_aliases = {}
+        # debugger module -> name its trace method is called by, if the
+        # trace method was imported under another name
+        self.trace_names = {}
+        # candidate trace method calls: (node, called name, called object)
+        self.calls = []
+
+    def visit(self, node):
+        if isinstance(node, ast.Call):
+            self.visit_call(node)
+        elif isinstance(node, ast.Import):
+            self.visit_import(node)
+        elif isinstance(node, ast.ImportFrom):
+            self.visit_import_from(node)
+
+    def visit_import(self, node):
+        found = {}
+        for alias in node.names:
+            if alias.name in DEBUGGERS:
+                found[alias.name] = alias.asname or alias.name
+        self.imported.update(found)
+        self.add_import_errors(node, found)
+
+    def visit_import_from(self, node):
+        if node.module not in DEBUGGERS:
+            return
+        trace_method = DEBUGGERS[node.module]
+        for alias in node.names:
+            if alias.name == trace_method:
+                trace_name = alias.asname or alias.name
+                self.trace_aliases[trace_name] = node.module
+                self.trace_names[node.module] = trace_name
+        self.imported[node.module] = node.module
+        self.add_import_errors(node, {node.module: node.module})
+
+    def add_import_errors(self, node, found):
+        if node.lineno in self.noqa:
+            return
+        for debugger in DEBUGGERS_ORDER:
+            if debugger in found:
+                self.import_errors.append({
+                    'message': format_debugger_message('import', debugger, found[debugger]),
+                    'line': node.lineno,
+                    'col': node.col_offset,
+                })
 
-            if hasattr(node, 'module') and node.module not in debugger_states.keys():
+    def visit_call(self, node):
+        if node.lineno in self.noqa:
+            return
+        func = node.func
+        if isinstance(func, ast.Name):
+            self.calls.append((node, func.id, None))
+        elif isinstance(func, ast.Attribute):
+            self.calls.append((node, func.attr, func.value))
+
+    def get_trace_name(self, debugger):
+        return self.trace_names.get(debugger, DEBUGGERS[debugger])
+
+    def get_debugger_name(self, name, value):
+        if isinstance(value, ast.Name):
+            for debugger in DEBUGGERS_ORDER:
+                if self.imported.get(debugger) == value.id:
+                    return value.id
+        elif value is None:
+            if name in self.trace_aliases:
+                return self.imported[self.trace_aliases[name]]
+            for debugger in DEBUGGERS_ORDER:
+                if debugger in self.imported and self.get_trace_name(debugger) == name:
+                    return self.imported[debugger]
+        if len(self.imported) == 1:
+            return list(self.imported.values())[0]
+        return 'debugger'
+
+    def get_errors(self):
+        errors = list(self.import_errors)
+        if not self.imported:
+            return errors
+        trace_methods = set(self.get_trace_name(debugger) for debugger in self.imported)
+        for node, name, value in self.calls:
+            if name not in trace_methods:
                 continue
-            elif hasattr(node, 'module'):
-                debuggers_found_here[node.module] = True
-                debugger_states[node.module]['name'] = node.module
-                debugger_states[node.module]['found'] = True
-
-            module_names = (hasattr(node, 'names') and [module_name.name for module_name in node.names]) or []
-            if isinstance(node, ast.Import):
-                for debugger in debugger_states.keys():
-                    if debugger in module_names:
-                        index = module_names.index(debugger)
-                        if hasattr(node.names[index], 'asname'):
-                            debugger_states[debugger]['name'] = node.names[index].asname or debugger
-                            debugger_states[debugger]['found'] = True
-                            debuggers_found_here[debugger] = True
-
-            elif isinstance(node, ast.ImportFrom):
-                trace_methods = [debugger_states[debugger]['trace_method'] for debugger in debugger_states if debugger_states[debugger]['found']]
-                traces_found = filter(lambda trace: trace in module_names, trace_methods)
-                if not traces_found:
-                    continue
-                for trace in traces_found:
-                    trace_index = trace in module_names and module_names.index(trace)
-                    if hasattr(node.names[trace_index], 'asname'):
-                        for debugger in debugger_states:
-                            if debuggers_found_here[debugger]:
-                                debugger_states[debugger]['trace_method'] = node.names[trace_index].asname or debugger_states[debugger]['trace_method']
-
-            if node.lineno not in noqa:
-                for debugger in debugger_states.keys():
-                    if debuggers_found_here[debugger]:
-                        errors.append({
-                            'message': format_debugger_message('import', debugger, debugger_states[debugger]['name']),
-                            'line': node.lineno,
-                            'col': node.col_offset,
-                        })
-
-        elif isinstance(node, ast.Call) and node.lineno not in noqa:
-            trace_methods = [debugger_states[debugger]['trace_method'] for debugger in debugger_states if debugger_states[debugger]['found']]
-            if (getattr(node.func, 'attr', None) in trace_methods or getattr(node.func, 'id', None) in trace_methods):
-                debugger_name = None
-                for debugger in debugger_states.keys():
-                    if (
-                        (
-                            (hasattr(node.func, 'value') and node.func.value.id == debugger_states[debugger]['name']) or
-                            (hasattr(node.func, 'id') and node.func.id == debugger_states[debugger]['trace_method'])
-                        ) and debugger_states[debugger]['found']
-                    ):
-                        debugger_name = debugger_states[debugger]['name']
-                        break
-                if not debugger_name:
-                    debuggers_found = [debugger_states[debugger]['name'] for debugger in debugger_states if debugger_states[debugger]['found']]
-                    if len(debuggers_found) == 1:
-                        debugger_name = debuggers_found[0]
-                    else:
-                        debugger_name = 'debugger'
-                set_trace_name = hasattr(node.func, 'attr') and node.func.attr or hasattr(node.func, 'id') and node.func.id
-                errors.append({
-                    "message": format_debugger_message('trace method', debugger_name, set_trace_name),
-                    "line": node.lineno,
-                    "col": node.col_offset
-                })
-    return errors
+            errors.append({
+                'message': format_debugger_message('trace method', self.get_debugger_name(name, value), name),
+                'line': node.lineno,
+                'col': node.col_offset,
+            })
+        return errors
@@ -23,14 +23,45 @@ IMPORT_APP = 30
 IMPORT_APP_RELATIVE = 40
 IMPORT_MIXED = -1
 
+# fields of the statements holding nested statements, in "_fields" order
+STATEMENT_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+_root_package_names = {}
+
 
 def root_package_name(name):
+    try:
+        return _root_package_names[name]
+    except KeyError:
+        pass
     p = ast.parse(name)
     for n in ast.walk(p):
         if isinstance(n, ast.Name):
-            return n.id
+            root = n.id
+            break
     else:
-        return None
+        root = None
+    _root_package_names[name] = root
+    return root
+
+
+def iter_child_statements(node):
+    """
+    Yield the statements nested in a statement, in source order.
+
+    Except handlers (and match cases) are not statements themselves, their
+    bodies are yielded in their place.
+    """
+    for field in STATEMENT_FIELDS:
+        children = getattr(node, field, None)
+        if not isinstance(children, list):
+            continue
+        for child in children:
+            if isinstance(child, ast.stmt):
+                yield child
+            else:
+                for statement in iter_child_statements(child):
+                    yield statement
 
 
 def is_sorted(seq):
@@ -84,6 +115,21 @@ class ImportVisitor(ast.NodeVisitor):
         )
         self.style = self.options['import_order_style']
 
+    def visit_Module(self, node):  # noqa
+        # imports are statements: walk statement bodies only, do not
+        # descend into expressions
+        stack = [node]
+        while stack:
+            statement = stack.pop()
+            if isinstance(statement, ast.Import):
+                self.visit_Import(statement)
+            elif isinstance(statement, ast.ImportFrom):
+                self.visit_ImportFrom(statement)
+            else:
+                children = list(iter_child_statements(statement))
+                children.reverse()
+                stack.extend(children)
+
     def visit_Import(self, node):  # noqa
         if node.col_offset != 0:
             return
@@ -225,9 +271,14 @@ class ImportOrderChecker(object):
         visitor = self.visitor_class(self.filename, self.options)
         visitor.visit(self.tree)
 
+        for error in self.check_imports_order(visitor):
+            yield error
+
+    def check_imports_order(self, visitor):
         style = self.options['import_order_style']
 
         prev_node = None
+        prev_key = None
         for node in visitor.imports:
             # Lines with the noqa flag are ignored entirely
             if pep8.noqa(self.lines[node.lineno - 1]):
@@ -256,15 +307,11 @@ class ImportOrderChecker(object):
                 )
 
             if prev_node is None:
-                prev_node = node
+                prev_node, prev_key = node, (n, k, cmp_n)
                 continue
 
-            pn, pk = visitor.node_sort_key(prev_node)
-
-            if style == "google":
-                cmp_pn = cmp_values(pn, style)
-            else:
-                cmp_pn = pn
+            # sort keys of the previous node are computed once
+            pn, pk, cmp_pn = prev_key
 
             # FUTURES
             # STDLIBS, STDLIB_FROMS
@@ -279,7 +326,7 @@ class ImportOrderChecker(object):
                     node, "I666",
                     "Import statement mixes groups"
                 )
-                prev_node = node
+                prev_node, prev_key = node, (n, k, cmp_n)
                 continue
 
             if cmp_n < cmp_pn:
@@ -326,4 +373,4 @@ class ImportOrderChecker(object):
                     "Missing newline before sections or imports."
                 )
 
-            prev_node = node
+            prev_node, prev_key = node, (n, k, cmp_n)
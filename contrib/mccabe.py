@@ -5,6 +5,7 @@
 """
 from __future__ import with_statement
 
+import hashlib
 import optparse
 import sys
 from collections import defaultdict
@@ -221,6 +222,299 @@ class PathGraphingAstVisitor(ASTVisitor):
     visitAsyncWith = visitWith
 
 
+class PathCounter(object):
+    """ The complexity of a path graph, counted without building the graph.
+
+        Every decision point adds one, like the extra edges it would add
+        to a PathGraph.  A graph without any node has a complexity of 2.
+    """
+
+    def __init__(self, name, entity, lineno):
+        self.name = name
+        self.entity = entity
+        self.lineno = lineno
+        self.decisions = 0
+        self.connected = False
+        # cleared when the walk stopped before the end of the graph
+        self.exact = True
+
+    def complexity(self):
+        """ Return the McCabe complexity for the graph.
+            The lower bound if the graph was not walked till the end.
+        """
+        if not self.connected:
+            return 2
+        return self.decisions + 1
+
+
+class ComplexityCache(object):
+    """ Complexities of graphs, keyed by a hash of their source lines.
+
+        Shared by the lints of a file, so only the functions edited since
+        the previous lint are walked again.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = {}
+
+    def key(self, lines):
+        text = '\n'.join(lines)
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8', 'replace')
+        return hashlib.md5(text).hexdigest()
+
+    def get(self, key, threshold=None):
+        """Return (decisions, connected, exact) if usable for threshold"""
+        entry = self.entries.get(key)
+        if entry is None or entry[2]:
+            return entry
+        # a lower bound only tells that the threshold is exceeded
+        if threshold is not None and entry[0] + 1 > threshold:
+            return entry
+        return None
+
+    def set(self, key, graph):
+        if len(self.entries) >= self.max_size:
+            self.entries.clear()
+        self.entries[key] = (graph.decisions, graph.connected, graph.exact)
+
+
+class PathCountingAstVisitor(object):
+    """ A visitor which computes the same complexities as
+        PathGraphingAstVisitor, counting decision points instead of
+        connecting path nodes.
+
+        The visitor is driven by enter() and leave() calls: enter()
+        returns the children of the node to visit next (or None if the
+        node is skipped) and leave() is called once they all are left.
+        preorder() walks a tree this way, a walker shared by several
+        checkers may do it as well.
+
+        If a threshold is given, a graph is not walked any further once
+        its complexity exceeds it; recount() finishes such a graph.  If
+        the source lines and a cache are
+        given, the complexities of the top level graphs are looked up by
+        the source from their first line up to the next statement.
+    """
+
+    def __init__(self, threshold=None, lines=None, cache=None):
+        self.threshold = threshold
+        self.lines = lines
+        self.cache = cache if lines is not None else None
+        # line following the top level statements, by node id
+        self.span_ends = {}
+        self.classnames = []
+        self.classname = ""
+        self.graphs = {}
+        # node and cache key of the graphs not walked till the end
+        self.unfinished = {}
+        self.walked = False
+        self._enter_cache = {}
+        self._leave_cache = {}
+        self.reset()
+
+    def reset(self):
+        self.graph = None
+        self.graph_node = None
+        self.graph_name = None
+        self.graph_key = None
+        self.graph_cached = False
+        self.stopped = False
+
+    def preorder(self, tree, visitor=None):
+        """Do preorder walk of tree"""
+        stack = [(tree, False)]
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                self.leave(node)
+                continue
+            children = self.enter(node)
+            if children is None:
+                continue
+            stack.append((node, True))
+            stack.extend([(child, False) for child in reversed(children)])
+        self.walked = True
+
+    def enter(self, node):
+        if self.stopped:
+            self.graph.exact = False
+            return None
+        klass = node.__class__
+        meth = self._enter_cache.get(klass)
+        if meth is None:
+            meth = getattr(self, 'enter' + klass.__name__, self.default)
+            self._enter_cache[klass] = meth
+        return meth(node)
+
+    def leave(self, node):
+        klass = node.__class__
+        meth = self._leave_cache.get(klass)
+        if meth is None:
+            meth = getattr(self, 'leave' + klass.__name__, None)
+            self._leave_cache[klass] = meth
+        if meth is not None:
+            meth(node)
+
+    def default(self, node):
+        children = list(iter_child_nodes(node))
+        end = self.span_ends.pop(id(node), None)
+        if end is not None and self.graph is None:
+            for child in children:
+                self.span_ends[id(child)] = end
+        return children
+
+    def body_ends(self, node_list, end):
+        """Remember the line following each top level statement"""
+        if end is None or self.graph is not None or self.cache is None:
+            return
+        span_ends = self.span_ends
+        for node, next_node in zip(node_list, node_list[1:]):
+            span_ends[id(node)] = next_node.lineno
+        if node_list:
+            span_ends[id(node_list[-1])] = end
+
+    def count(self, decisions=0):
+        """Add a path node and the decision points it brings."""
+        graph = self.graph
+        graph.connected = True
+        if decisions:
+            graph.decisions += decisions
+            if (self.threshold is not None and
+                    graph.decisions + 1 > self.threshold):
+                self.stopped = True
+
+    def start_graph(self, node, name, graph):
+        """Start a top level graph, return False if it is cached"""
+        self.graph = graph
+        self.graph_node = node
+        self.graph_name = name
+        end = self.span_ends.pop(id(node), None)
+        if self.cache is None or end is None:
+            return True
+        key = self.cache.key(self.lines[node.lineno - 1:end - 1])
+        entry = self.cache.get(key, self.threshold)
+        self.graph_key = key
+        if entry is not None:
+            graph.decisions, graph.connected, graph.exact = entry
+            self.graph_cached = True
+            return False
+        return True
+
+    def end_graph(self, node):
+        if node is not self.graph_node:
+            return
+        self.graphs[self.graph_name] = self.graph
+        if not self.graph.exact:
+            self.unfinished[id(self.graph)] = (node, self.graph_key)
+        if self.graph_key is not None and not self.graph_cached:
+            self.cache.set(self.graph_key, self.graph)
+        self.reset()
+
+    def recount(self, graph):
+        """Count the exact complexity of a graph the walk stopped in"""
+        node, key = self.unfinished.pop(id(graph), (None, None))
+        if node is None:
+            return
+        visitor = PathCountingAstVisitor()
+        visitor.preorder(node)
+        for counted in visitor.graphs.values():
+            graph.decisions = counted.decisions
+            graph.connected = counted.connected
+            graph.exact = True
+        if key is not None:
+            self.cache.set(key, graph)
+
+    def enterModule(self, node):
+        end = len(self.lines) + 1 if self.lines is not None else None
+        self.body_ends(node.body, end)
+        return node.body
+
+    def enterFunctionDef(self, node):
+
+        if self.classname:
+            entity = '%s%s' % (self.classname, node.name)
+        else:
+            entity = node.name
+
+        if self.graph is not None:
+            # closure
+            self.count(1)
+            return node.body
+
+        name = '%d:1: %r' % (node.lineno, entity)
+        graph = PathCounter(name, entity, node.lineno)
+        if self.start_graph(node, self.classname + node.name, graph):
+            return node.body
+        return ()
+
+    enterAsyncFunctionDef = enterFunctionDef
+    leaveFunctionDef = leaveAsyncFunctionDef = end_graph
+
+    def enterClassDef(self, node):
+        self.body_ends(node.body, self.span_ends.pop(id(node), None))
+        self.classnames.append(self.classname)
+        self.classname += node.name + "."
+        return node.body
+
+    def leaveClassDef(self, node):
+        self.classname = self.classnames.pop()
+
+    def enterSimpleStatement(self, node):
+        if self.graph is not None:
+            self.count()
+        return ()
+
+    enterAssert = enterAssign = enterAugAssign = enterDelete = enterPrint = \
+        enterRaise = enterYield = enterImport = enterCall = enterSubscript = \
+        enterPass = enterContinue = enterBreak = enterGlobal = enterReturn = \
+        enterAwait = enterSimpleStatement
+
+    def enterLoop(self, node):
+        name = "Loop %d" % node.lineno
+        return self._subgraph(node, name)
+
+    enterAsyncFor = enterFor = enterWhile = enterLoop
+
+    def enterIf(self, node):
+        name = "If %d" % node.lineno
+        return self._subgraph(node, name)
+
+    def _subgraph(self, node, name, extra_blocks=()):
+        """count the paths of any `if` and `for` statements"""
+        if self.graph is None:
+            # global loop
+            graph = PathCounter(name, name, node.lineno)
+            if not self.start_graph(node, self.classname + name, graph):
+                return ()
+        # every block but the first one is another path
+        self.count(1 + len(extra_blocks))
+        children = list(node.body)
+        for extra in extra_blocks:
+            children.extend(extra.body)
+        children.extend(node.orelse)
+        return children
+
+    leaveAsyncFor = leaveFor = leaveWhile = leaveIf = end_graph
+
+    def enterTryExcept(self, node):
+        name = "TryExcept %d" % node.lineno
+        return self._subgraph(node, name, extra_blocks=node.handlers)
+
+    enterTry = enterTryExcept
+    leaveTry = leaveTryExcept = end_graph
+
+    def enterWith(self, node):
+        end = self.span_ends.pop(id(node), None)
+        if self.graph is not None:
+            self.count()
+        self.body_ends(node.body, end)
+        return node.body
+
+    enterAsyncWith = enterWith
+
+
 class McCabeChecker(object):
     """McCabe cyclomatic complexity checker."""
     name = 'mccabe'
@@ -229,8 +523,14 @@ class McCabeChecker(object):
     _error_tmpl = "C901 %r is too complex (%d)"
     max_complexity = 0
 
-    def __init__(self, tree, filename):
+    def __init__(self, tree, filename, max_complexity=None, lines=None,
+                 cache=None):
         self.tree = tree
+        if max_complexity is not None:
+            self.max_complexity = max_complexity
+        self.lines = lines
+        self.cache = cache
+        self.visitor = None
 
     @classmethod
     def add_options(cls, parser):
@@ -242,13 +542,37 @@ class McCabeChecker(object):
     def parse_options(cls, options):
         cls.max_complexity = int(options.max_complexity)
 
+    def get_visitor(self):
+        """Return the visitor counting complexities of the tree"""
+        if self.visitor is None:
+            self.visitor = PathCountingAstVisitor(self.max_complexity,
+                                                  self.lines, self.cache)
+        return self.visitor
+
+    def get_graphs(self, exact=False):
+        """Return the complexities of the functions and top level blocks
+
+        If exact is set, the graphs over the threshold are counted till
+        the end as well.
+        """
+        visitor = self.get_visitor()
+        if not visitor.walked:
+            visitor.preorder(self.tree)
+        graphs = list(visitor.graphs.values())
+        if exact:
+            for graph in graphs:
+                if not graph.exact:
+                    visitor.recount(graph)
+        return graphs
+
     def run(self):
         if self.max_complexity < 0:
             return
-        visitor = PathGraphingAstVisitor()
-        visitor.preorder(self.tree, visitor)
-        for graph in visitor.graphs.values():
+        visitor = self.get_visitor()
+        for graph in self.get_graphs():
             if graph.complexity() > self.max_complexity:
+                # the walk stopped early, count the real complexity
+                visitor.recount(graph)
                 text = self._error_tmpl % (graph.entity, graph.complexity())
                 yield graph.lineno, 0, text, type(self)
 
@@ -262,8 +586,8 @@ def get_code_complexity(code, threshold=7, filename='stdin'):
         return 0
 
     complx = []
-    McCabeChecker.max_complexity = threshold
-    for lineno, offset, text, check in McCabeChecker(tree, filename).run():
+    checker = McCabeChecker(tree, filename, threshold)
+    for lineno, offset, text, check in checker.run():
         complx.append('%s:%d:1: %s' % (filename, lineno, text))
 
     if len(complx) == 0:
@@ -294,7 +618,10 @@ def main(argv=None):
     with open(args[0], "rU") as mod:
         code = mod.read()
     tree = compile(code, args[0], "exec", ast.PyCF_ONLY_AST)
-    visitor = PathGraphingAstVisitor()
+    if options.dot:
+        visitor = PathGraphingAstVisitor()
+    else:
+        visitor = PathCountingAstVisitor()
     visitor.preorder(tree, visitor)
 
     if options.dot:
@@ -37,12 +37,17 @@ else:
         return pos_args + kw_only
 
 
+# bound visitor methods of the checks, by AST node class
+_visitor_methods = {}
+
+
 class _ASTCheckMeta(type):
     def __init__(self, class_name, bases, namespace):
         try:
             self._checks.append(self())
         except AttributeError:
             self._checks = []
+        _visitor_methods.clear()
 
 
 def _err(self, node, code):
@@ -85,13 +90,36 @@ class NamingChecker(object):
         return self.visit_tree(self._node) if self._node else ()
 
     def visit_tree(self, node):
-        for error in self.visit_node(node):
-            yield error
-        self.parents.append(node)
-        for child in iter_child_nodes(node):
-            for error in self.visit_tree(child):
+        # walk with an explicit stack: deeply nested code must not hit
+        # the recursion limit
+        parents = self.parents
+        base = len(parents)
+        stack = [(node, base)]
+        while stack:
+            node, depth = stack.pop()
+            while len(parents) > depth:
+                parents.pop()
+            for error in self.visit_node(node):
                 yield error
-        self.parents.pop()
+            children = list(iter_child_nodes(node))
+            if children:
+                parents.append(node)
+                depth += 1
+                children.reverse()
+                stack.extend([(child, depth) for child in children])
+        while len(parents) > base:
+            parents.pop()
+
+    def get_visitor_methods(self, node_class):
+        """Return the visitor methods of the checks for a node class"""
+        methods = _visitor_methods.get(node_class)
+        if methods is None:
+            method = 'visit_' + node_class.__name__.lower()
+            methods = [getattr(visitor, method) for visitor in self.visitors
+                       if hasattr(visitor, method)]
+            if self.visitors is BaseASTCheck._checks:
+                _visitor_methods[node_class] = methods
+        return methods
 
     def visit_node(self, node):
         if isinstance(node, ast.ClassDef):
@@ -99,13 +127,12 @@ class NamingChecker(object):
         elif isinstance(node, ast.FunctionDef):
             self.find_global_defs(node)
 
-        method = 'visit_' + node.__class__.__name__.lower()
+        methods = self.get_visitor_methods(node.__class__)
+        if not methods:
+            return
         parents = self.parents
         ignore_names = self.ignore_names
-        for visitor in self.visitors:
-            visitor_method = getattr(visitor, method, None)
-            if visitor_method is None:
-                continue
+        for visitor_method in methods:
             for error in visitor_method(node, parents, ignore_names):
                 yield error
 
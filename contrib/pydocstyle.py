@@ -14,6 +14,7 @@ import ast
 import copy
 import logging
 import tokenize as tk
+from bisect import bisect_right
 from itertools import takewhile, dropwhile, chain
 from re import compile as re
 import itertools
@@ -527,6 +528,323 @@ class Parser(object):
                       self.current.kind, self.current.value)
 
 
+class TreeParseError(Exception):
+    """The module AST can not be mapped on its source with certainty."""
+
+
+STRING_START = re(r'[bBrRuUfF]{0,2}(\'\'\'|"""|\'|")')
+STRING_ENDS = dict((quote, re('(?s)' + pattern)) for quote, pattern in (
+    ("'", tk.Single), ('"', tk.Double),
+    ("'''", tk.Single3), ('"""', tk.Double3),
+))
+SPACE = re(r'(?:[ \t\f\r]|\\\r?\n)*')
+SPACE_LINES = re(r'(?:[ \t\f\r\n]|\\\r?\n|#[^\r\n]*)*')
+HEADER_TOKEN = re(r'[bBrRuUfF]{0,2}(?:\'\'\'|"""|\'|")|#|[()\[\]{}:]')
+LINE_TOKEN = re(r'[bBrRuUfF]{0,2}(?:\'\'\'|"""|\'|")|#|\\\r?\n|[()\[\]{}\n]')
+DEFINITION_KEYWORD = re(r'(?:async\s+)?(def|class)\s+\w+')
+CLAUSE = re(r'\s*(?:else\s*:|finally\s*:|elif\b)')
+
+
+class TreeParser(object):
+    """Build the module definitions from an already compiled module AST.
+
+    The result is the same as the one of `Parser`, but the structure of the
+    module is taken from the AST, so the module is not tokenized. Only the
+    definition headers, the docstrings and the `__all__` value are read from
+    the source text. Modules the AST can not be mapped on with certainty are
+    parsed by `Parser`. Decorator arguments are not recovered, no check uses
+    them.
+    """
+
+    def __call__(self, filelike, filename, tree):
+        self.source = filelike.readlines()
+        self.text = ''.join(self.source)
+        self.filename = filename
+        try:
+            return self.parse_module(tree)
+        except TreeParseError as error:
+            log.debug("can't use module AST (%s), tokenizing it.", error)
+            return parse(StringIO(self.text), filename)
+
+    def line(self, position):
+        """Return the line number of a position in the source text."""
+        return bisect_right(self.offsets, position)
+
+    def skip_string(self, position):
+        """Return the position after the string literal at `position`."""
+        match = STRING_START.match(self.text, position)
+        end = STRING_ENDS[match.group(1)].match(self.text, match.end())
+        if end is None:
+            raise TreeParseError('unterminated string')
+        return end.end()
+
+    def skip_comment(self, position):
+        """Return the position of the end of the line at `position`."""
+        end = self.text.find('\n', position)
+        return len(self.text) if end < 0 else end
+
+    def skip_logical_line(self, position):
+        """Return the position after the logical line at `position`."""
+        depth = 0
+        while True:
+            match = LINE_TOKEN.search(self.text, position)
+            if match is None:
+                return len(self.text)
+            token = match.group()
+            position = match.end()
+            if token[-1] in '\'"':
+                position = self.skip_string(match.start())
+            elif token == '#':
+                position = self.skip_comment(position)
+            elif token in '([{':
+                depth += 1
+            elif token in ')]}':
+                depth -= 1
+            elif token == '\n' and depth == 0:
+                return position
+
+    def skip_header(self, position):
+        """Return the position after the colon of a definition header.
+
+        `position` is after the definition name. Like `Parser` does, the
+        first colon after the parameters is taken, so the headers in which
+        it is not the one ending the header are refused.
+        """
+        text = self.text
+        depth = 0
+        position = SPACE.match(text, position).end()
+        if text.startswith('(', position):
+            parameters = 0
+            while True:
+                match = HEADER_TOKEN.search(text, position)
+                if match is None:
+                    raise TreeParseError('unterminated parameters')
+                token = match.group()
+                position = match.end()
+                if token[-1] in '\'"':
+                    position = self.skip_string(match.start())
+                elif token == '#':
+                    position = self.skip_comment(position)
+                elif token == '(':
+                    parameters += 1
+                elif token == ')':
+                    parameters -= 1
+                    if parameters == 0:
+                        break
+        start = position
+        while True:
+            match = HEADER_TOKEN.search(text, position)
+            if match is None:
+                raise TreeParseError('no header colon')
+            token = match.group()
+            position = match.end()
+            if token[-1] in '\'"':
+                position = self.skip_string(match.start())
+            elif token == '#':
+                position = self.skip_comment(position)
+            elif token == ':':
+                if text.startswith('=', position):
+                    continue
+                if depth or 'lambda' in text[start:position]:
+                    raise TreeParseError('ambiguous header colon')
+                return position
+            elif token in '([{':
+                depth += 1
+            else:
+                depth -= 1
+
+    def start_line(self, node):
+        """Return the line of the first token of a statement."""
+        decorators = getattr(node, 'decorator_list', None)
+        if decorators:
+            line = decorators[0].lineno
+            if not self.source[line - 1].lstrip().startswith('@'):
+                raise TreeParseError('decorator not on its own line')
+            return line
+        if node.col_offset < 0:
+            raise TreeParseError('statement starts with a multiline string')
+        return node.lineno
+
+    def clause_line(self, node):
+        """Return the line of the `else`, `elif` or `finally` clause."""
+        line = self.start_line(node)
+        if CLAUSE.match(self.source[line - 1]):
+            return line
+        for line in range(line - 1, 0, -1):
+            text = self.source[line - 1].strip()
+            if text and not text.startswith('#'):
+                if CLAUSE.match(text):
+                    return line
+                break
+        raise TreeParseError('clause line not found')
+
+    def parse_docstring(self, position):
+        """Return the string literal at `position` and the position after."""
+        if STRING_START.match(self.text, position):
+            end = self.skip_string(position)
+            return self.text[position:end], end
+        return None, position
+
+    def parse_decorators(self, node):
+        """Return the decorators of a definition node."""
+        decorators = []
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call):
+                decorator = decorator.func
+            names = []
+            while isinstance(decorator, ast.Attribute):
+                names.append(decorator.attr)
+                decorator = decorator.value
+            if not isinstance(decorator, ast.Name):
+                raise TreeParseError('decorator is not a dotted name')
+            names.append(decorator.id)
+            decorators.append(Decorator('.'.join(reversed(names)), ''))
+        self.decorators_count += len(decorators)
+        return decorators
+
+    def parse_definitions(self, class_, body, follow):
+        """Return the definitions in a list of statements.
+
+        `follow` is the first line of whatever follows the statements in the
+        source, the definitions which are last in them end before it.
+        """
+        definitions = []
+        for index, node in enumerate(body):
+            kind = type(node).__name__
+            if kind in ('FunctionDef', 'AsyncFunctionDef', 'ClassDef'):
+                parse_node = self.parse_definition
+            elif isinstance(getattr(node, 'body', None), list):
+                parse_node = self.parse_compound
+            else:
+                continue
+            if index + 1 < len(body):
+                node_follow = self.start_line(body[index + 1])
+            else:
+                node_follow = follow
+            definitions.extend(parse_node(class_, node, node_follow))
+        return definitions
+
+    def parse_compound(self, class_, node, follow):
+        """Return the definitions in the blocks of a compound statement."""
+        kind = type(node).__name__
+        if kind in ('If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith'):
+            blocks = [(node.body, None)]
+        elif kind in ('Try', 'TryStar', 'TryExcept', 'TryFinally'):
+            blocks = [(node.body, None)]
+            for handler in getattr(node, 'handlers', ()):
+                blocks.append((handler.body, handler.lineno))
+        else:
+            raise TreeParseError('unknown compound statement %s' % kind)
+        for block in (getattr(node, 'orelse', None),
+                      getattr(node, 'finalbody', None)):
+            if block:
+                blocks.append((block, self.clause_line(block[0])))
+        definitions = []
+        for index, (block, _) in enumerate(blocks):
+            if index + 1 < len(blocks):
+                block_follow = blocks[index + 1][1]
+            else:
+                block_follow = follow
+            definitions.extend(
+                self.parse_definitions(class_, block, block_follow))
+        return definitions
+
+    def parse_definition(self, class_, node, follow):
+        """Return a one item list with the definition of a node."""
+        text = self.text
+        if node.decorator_list:
+            position = self.offsets[self.start_line(node) - 1]
+            for _ in node.decorator_list:
+                position = SPACE_LINES.match(text, position).end()
+                if not text.startswith('@', position):
+                    raise TreeParseError('decorator not found')
+                position = self.skip_logical_line(position)
+            position = SPACE_LINES.match(text, position).end()
+        else:
+            position = SPACE.match(text, self.offsets[node.lineno - 1]).end()
+        match = DEFINITION_KEYWORD.match(text, position)
+        if match is None:
+            raise TreeParseError('definition keyword not found')
+        class_ = class_._nest(match.group(1))
+        start = self.line(match.start(1))
+        self.accumulated_decorators.extend(self.parse_decorators(node))
+        position = SPACE.match(text, self.skip_header(match.end())).end()
+        if position == len(text) or text[position] in '#\n':
+            position = SPACE_LINES.match(text, position).end()
+            docstring, _ = self.parse_docstring(position)
+            decorators = self.accumulated_decorators
+            self.accumulated_decorators = []
+            children = self.parse_definitions(class_, node.body, follow)
+            end = follow - 1
+        else:  # one-liner definition
+            docstring, position = self.parse_docstring(position)
+            decorators = []
+            children = []
+            end = self.line(SPACE.match(text, position).end())
+        definition = class_(node.name, self.source, start, end,
+                            decorators, docstring, children, None)
+        for child in definition.children:
+            child.parent = definition
+        return [definition]
+
+    def parse_all(self, tree):
+        """Return the value of `__all__` of the module.
+
+        Only a single `__all__` assignment at the module level is read, the
+        other uses of `__all__` are left to `Parser`.
+        """
+        if '__all__' not in self.text:
+            return None
+        if self.text.count('__all__') == 1:
+            for node in tree.body:
+                if (isinstance(node, ast.Assign) and
+                        len(node.targets) == 1 and
+                        getattr(node.targets[0], 'id', None) == '__all__'):
+                    parser = Parser()
+                    parser.filename = self.filename
+                    parser.stream = TokenStream(
+                        StringIO(self.text[self.text.index('__all__'):]))
+                    parser.parse_all()
+                    return parser.all
+        raise TreeParseError('__all__ is not a single assignment')
+
+    def parse_module(self, tree):
+        """Return a Module object for the module AST."""
+        text = self.text
+        if '\r' in text and '\r' in text.replace('\r\n', ''):
+            raise TreeParseError('lone carriage returns')
+        self.offsets = [0]
+        for line in self.source[:-1]:
+            self.offsets.append(self.offsets[-1] + len(line))
+        self.accumulated_decorators = []
+        self.decorators_count = 0
+        all = self.parse_all(tree)
+        future_imports = defaultdict(lambda: False)
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and \
+                    node.module == '__future__':
+                for alias in node.names:
+                    if alias.name != '*':
+                        future_imports[alias.name] = True
+        docstring, _ = self.parse_docstring(SPACE_LINES.match(text).end())
+        end = len(self.source) + 1
+        children = self.parse_definitions(Module, tree.body, end)
+        if text.count('@') != self.decorators_count and \
+                hasattr(ast, 'MatMult') and \
+                any(isinstance(node, ast.MatMult) for node in ast.walk(tree)):
+            # `Parser` takes the matrix multiplication operator for decorator
+            raise TreeParseError('matrix multiplication')
+        cls = Module
+        if self.filename.endswith('__init__.py'):
+            cls = Package
+        module = cls(self.filename, self.source, 1, end,
+                     [], docstring, children, None, all)
+        for child in module.children:
+            child.parent = module
+        module.future_imports = future_imports
+        return module
+
+
 class Error(object):
     """Error in docstring style."""
 
@@ -1335,6 +1653,7 @@ def run_pydocstyle(used_pep257=False):
 
 
 parse = Parser()
+parse_tree = TreeParser()
 
 
 def check_for(kind, terminal=False):
@@ -1355,32 +1674,65 @@ class PEP257Checker(object):
 
     """
 
-    def check_source(self, source, filename):
-        module = parse(StringIO(source), filename)
+    def check_source(self, source, filename, tree=None):
+        if tree is None:
+            module = parse(StringIO(source), filename)
+        else:
+            module = parse_tree(StringIO(source), filename, tree)
         for definition in module:
-            for check in self.checks:
+            table = self.get_check_table(type(definition))
+            for check, terminal, explanation in table:
                 terminate = False
-                if isinstance(definition, check._check_for):
-                    error = check(None, definition, definition.docstring)
-                    errors = error if hasattr(error, '__iter__') else [error]
-                    for error in errors:
-                        if error is not None:
-                            partition = check.__doc__.partition('.\n')
-                            message, _, explanation = partition
-                            error.set_context(explanation=explanation,
-                                              definition=definition)
-                            yield error
-                            if check._terminal:
-                                terminate = True
-                                break
+                error = check(None, definition, definition.docstring)
+                errors = error if hasattr(error, '__iter__') else [error]
+                for error in errors:
+                    if error is not None:
+                        error.set_context(explanation=explanation,
+                                          definition=definition)
+                        yield error
+                        if terminal:
+                            terminate = True
+                            break
                 if terminate:
                     break
 
     @property
     def checks(self):
-        all = [check for check in vars(type(self)).values()
-               if hasattr(check, '_check_for')]
-        return sorted(all, key=lambda check: not check._terminal)
+        return self.get_checks()
+
+    @classmethod
+    def get_checks(cls):
+        """Return the checks of the class, the terminal ones first.
+
+        The list is built once per class.
+        """
+        checks = cls.__dict__.get('_checks')
+        if checks is None:
+            all = [check for check in vars(cls).values()
+                   if hasattr(check, '_check_for')]
+            checks = sorted(all, key=lambda check: not check._terminal)
+            cls._checks = checks
+        return checks
+
+    @classmethod
+    def get_check_table(cls, kind):
+        """Return the checks relevant for the definition type `kind`.
+
+        Every item is a `(check, terminal, explanation)` tuple, where the
+        explanation is the part of the check docstring after the summary.
+        The table is built once per class and definition type.
+        """
+        tables = cls.__dict__.get('_check_tables')
+        if tables is None:
+            tables = cls._check_tables = {}
+        table = tables.get(kind)
+        if table is None:
+            table = tables[kind] = [
+                (check, check._terminal, check.__doc__.partition('.\n')[2])
+                for check in cls.get_checks()
+                if issubclass(kind, check._check_for)
+            ]
+        return table
 
     @check_for(Definition, terminal=True)
     def check_docstring_missing(self, definition, docstring):
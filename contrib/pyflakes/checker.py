@@ -68,6 +68,13 @@ class _FieldsOrder(dict):
         return fields
 
 
+# All AST node classes, used to build the node handlers dispatch tables
+_astNodeClasses = tuple(
+    obj for obj in vars(ast).values()
+    if isinstance(obj, type) and issubclass(obj, ast.AST)
+)
+
+
 def iter_child_nodes(node, omit=None, _fields_order=_FieldsOrder()):
     """
     Yield all direct child nodes of *node*, that is, all fields that
@@ -84,6 +91,57 @@ def iter_child_nodes(node, omit=None, _fields_order=_FieldsOrder()):
                 yield item
 
 
+class _DoctestCache(dict):
+    """
+    Parsed doctest examples and their compiled ASTs, keyed by docstring.
+
+    Every item is a tuple of C{(source, lineno, indent, tree, error)} for
+    each example, where C{error} is the C{(lineno, offset)} of the syntax
+    error if the example can not be compiled.  The ASTs are shared by all
+    the checkers, so they are never modified.
+    """
+
+    maxsize = 1024
+    _getExamples = doctest.DocTestParser().get_examples
+
+    def __missing__(self, docstring):
+        try:
+            examples = self._getExamples(docstring)
+        except ValueError:
+            # e.g. line 6 of the docstring for <string> has inconsistent
+            # leading whitespace: ...
+            examples = ()
+        parsed = []
+        for example in examples:
+            tree = error = None
+            try:
+                tree = compile(example.source, "<doctest>", "exec",
+                               ast.PyCF_ONLY_AST)
+            except SyntaxError:
+                e = sys.exc_info()[1]
+                error = (e.lineno, e.offset)
+            parsed.append((example.source, example.lineno, example.indent,
+                           tree, error))
+        if len(self) >= self.maxsize:
+            self.clear()
+        self[docstring] = parsed = tuple(parsed)
+        return parsed
+
+
+_doctestCache = _DoctestCache()
+
+
+class _Location(object):
+    """
+    Location of a doctest node in the checked module.
+    """
+    __slots__ = ('lineno', 'col_offset')
+
+    def __init__(self, lineno, col_offset):
+        self.lineno = lineno
+        self.col_offset = col_offset
+
+
 class Binding(object):
     """
     Represents the binding of a value to a name.
@@ -95,6 +153,7 @@ class Binding(object):
     @ivar used: pair of (L{Scope}, line-number) indicating the scope and
                 line number that this binding was last used
     """
+    __slots__ = ('name', 'source', 'used')
 
     def __init__(self, name, source):
         self.name = name
@@ -118,6 +177,7 @@ class Definition(Binding):
     """
     A binding that defines a function or a class.
     """
+    __slots__ = ()
 
 
 class Importation(Definition):
@@ -128,6 +188,7 @@ class Importation(Definition):
         possibly including multiple dotted components.
     @type fullName: C{str}
     """
+    __slots__ = ('fullName', 'redefined')
 
     def __init__(self, name, source):
         self.fullName = name
@@ -145,6 +206,7 @@ class Argument(Binding):
     """
     Represents binding a name as an argument.
     """
+    __slots__ = ()
 
 
 class Assignment(Binding):
@@ -155,14 +217,15 @@ class Assignment(Binding):
     the checker does not consider assignments in tuple/list unpacking to be
     Assignments, rather it treats them as simple Bindings.
     """
+    __slots__ = ()
 
 
 class FunctionDefinition(Definition):
-    pass
+    __slots__ = ()
 
 
 class ClassDefinition(Definition):
-    pass
+    __slots__ = ()
 
 
 class ExportBinding(Binding):
@@ -179,6 +242,7 @@ class ExportBinding(Binding):
     Names which are imported and not otherwise used but appear in the value of
     C{__all__} will not have an unused import warning reported for them.
     """
+    __slots__ = ('names',)
 
     def __init__(self, name, source, scope):
         if '__all__' in scope and isinstance(source, ast.AugAssign):
@@ -193,7 +257,17 @@ class ExportBinding(Binding):
 
 
 class Scope(dict):
-    importStarred = False       # set to True when import * is found
+    """
+    @ivar starredNames: Names bound by the star imports that were resolved
+        with a L{pyflakes.symbols.SymbolIndex}.  C{importStarred} is only set
+        for the star imports which could not be resolved.
+    """
+    __slots__ = ('importStarred', 'starredNames')
+
+    def __init__(self):
+        super(Scope, self).__init__()
+        self.importStarred = False      # set to True when import * is found
+        self.starredNames = frozenset()
 
     def __repr__(self):
         scope_cls = self.__class__.__name__
@@ -201,7 +275,7 @@ class Scope(dict):
 
 
 class ClassScope(Scope):
-    pass
+    __slots__ = ()
 
 
 class FunctionScope(Scope):
@@ -210,12 +284,14 @@ class FunctionScope(Scope):
 
     @ivar globals: Names declared 'global' in this function.
     """
-    usesLocals = False
+    __slots__ = ('usesLocals', 'globals', 'returnValue', 'isGenerator')
+
     alwaysUsed = set(['__tracebackhide__',
                       '__traceback_info__', '__traceback_supplement__'])
 
     def __init__(self):
         super(FunctionScope, self).__init__()
+        self.usesLocals = False
         # Simplify: manage the special locals as globals
         self.globals = self.alwaysUsed.copy()
         self.returnValue = None     # First non-empty return
@@ -233,11 +309,11 @@ class FunctionScope(Scope):
 
 
 class GeneratorScope(Scope):
-    pass
+    __slots__ = ()
 
 
 class ModuleScope(Scope):
-    pass
+    __slots__ = ()
 
 
 # Globally defined names which are not attributes of the builtins module, or
@@ -245,6 +321,27 @@ class ModuleScope(Scope):
 _MAGIC_GLOBALS = ['__file__', '__builtins__', 'WindowsError']
 
 
+_builtInsSets = {}
+
+
+def getBuiltIns(builtIns, extra=()):
+    """
+    Return the C{builtIns} names extended with the C{extra} names.
+
+    The result is an interned frozenset: it is built once for every
+    distinct configuration and then shared by all the checkers using it.
+    """
+    if not isinstance(builtIns, frozenset):
+        builtIns = frozenset(builtIns)
+    key = (builtIns, frozenset(extra))
+    try:
+        return _builtInsSets[key]
+    except KeyError:
+        pass
+    _builtInsSets[key] = result = builtIns.union(extra)
+    return result
+
+
 def getNodeName(node):
     # Returns node.id, or node.name, or None
     if hasattr(node, 'id'):     # One of the many nodes with an id
@@ -264,29 +361,64 @@ class Checker(object):
 
     @ivar _deferredAssignments: Similar to C{_deferredFunctions}, but for
         callables which are deferred assignment checks.
+
+    @ivar _nodeParents: Parent of every handled node, keyed by C{id(node)}.
+
+    @ivar _nodeDepths: Depth of every handled node, keyed by C{id(node)}.
+        The tree nodes are never modified with parent or depth attributes,
+        so they do not reference each other in cycles.
+
+    @ivar _forkChains: Chain of IF/TRY forks every handled node is located
+        in, keyed by C{id(node)}.  See L{getForkChain}.
+
+    @ivar _forkParts: Index of the fork alternative for every direct child
+        of the IF/TRY forks, keyed by C{id(fork)} and then C{id(child)}.
+
+    @ivar _nodeOffsets: Offset of every handled doctest node, keyed by
+        C{id(node)}.  Doctest ASTs are cached and shared, so their positions
+        are shifted by L{getLocation} instead of being modified.
+
+    @ivar _doctestTrees: Doctest ASTs handled by this checker, keyed by
+        C{id(tree)}.
+
+    @ivar symbolIndex: Optional L{pyflakes.symbols.SymbolIndex} used to
+        resolve the names bound by star imports.
+
+    @ivar modulePath: Path of the checked module to resolve relative star
+        imports against, C{filename} if not given.  It does not change the
+        C{filename} based checks, such as the ones for C{__init__.py}.
     """
 
     nodeDepth = 0
     offset = None
     traceTree = False
 
-    builtIns = set(builtin_vars).union(_MAGIC_GLOBALS)
+    builtIns = frozenset(builtin_vars).union(_MAGIC_GLOBALS)
     _customBuiltIns = os.environ.get('PYFLAKES_BUILTINS')
     if _customBuiltIns:
-        builtIns.update(_customBuiltIns.split(','))
+        builtIns = builtIns.union(_customBuiltIns.split(','))
     del _customBuiltIns
 
     def __init__(self, tree, filename='(none)', builtins=None,
-                 withDoctest='PYFLAKES_DOCTEST' in os.environ):
-        self._nodeHandlers = {}
+                 withDoctest='PYFLAKES_DOCTEST' in os.environ,
+                 symbolIndex=None, modulePath=None):
+        self._nodeHandlers = self.getNodeHandlers()
+        self._nodeParents = {}
+        self._nodeDepths = {}
+        self._forkChains = {}
+        self._forkParts = {}
+        self._nodeOffsets = {}
+        self._doctestTrees = {}
         self._deferredFunctions = []
         self._deferredAssignments = []
         self.deadScopes = []
         self.messages = []
         self.filename = filename
         if builtins:
-            self.builtIns = self.builtIns.union(builtins)
+            self.builtIns = getBuiltIns(self.builtIns, builtins)
         self.withDoctest = withDoctest
+        self.symbolIndex = symbolIndex
+        self.modulePath = modulePath or filename
         self.scopeStack = [ModuleScope()]
         self.exceptHandlers = [()]
         self.futuresAllowed = True
@@ -349,7 +481,8 @@ class Checker(object):
                 if not scope.importStarred and \
                    os.path.basename(self.filename) != '__init__.py':
                     # Look for possible mistakes in the export list
-                    undefined = all_names.difference(scope)
+                    undefined = all_names.difference(scope).difference(
+                        scope.starredNames)
                     for name in undefined:
                         self.report(messages.UndefinedExport,
                                     scope['__all__'].source, name)
@@ -376,27 +509,45 @@ class Checker(object):
         self.scopeStack.append(scopeClass())
 
     def report(self, messageClass, *args, **kwargs):
+        if self._nodeOffsets:
+            args = [self.getLocation(arg) if isinstance(arg, ast.AST) else arg
+                    for arg in args]
         self.messages.append(messageClass(self.filename, *args, **kwargs))
 
+    def getLocation(self, node):
+        """
+        Return the node, or its location in the module for doctest nodes.
+        """
+        try:
+            offset = self._nodeOffsets[id(node)]
+        except KeyError:
+            return node
+        return _Location(node.lineno + offset[0],
+                         node.col_offset + offset[1])
+
     def getParent(self, node):
         # Lookup the first parent which is not Tuple, List or Starred
         while True:
-            node = node.parent
+            node = self._nodeParents[id(node)]
             if not hasattr(node, 'elts') and not hasattr(node, 'ctx'):
                 return node
 
     def getCommonAncestor(self, lnode, rnode, stop):
-        if stop in (lnode, rnode) or not (hasattr(lnode, 'parent') and
-                                          hasattr(rnode, 'parent')):
+        parents = self._nodeParents
+        if stop in (lnode, rnode) or not (id(lnode) in parents and
+                                          id(rnode) in parents):
             return None
         if lnode is rnode:
             return lnode
 
-        if (lnode.depth > rnode.depth):
-            return self.getCommonAncestor(lnode.parent, rnode, stop)
-        if (lnode.depth < rnode.depth):
-            return self.getCommonAncestor(lnode, rnode.parent, stop)
-        return self.getCommonAncestor(lnode.parent, rnode.parent, stop)
+        ldepth = self._nodeDepths[id(lnode)]
+        rdepth = self._nodeDepths[id(rnode)]
+        if (ldepth > rdepth):
+            return self.getCommonAncestor(parents[id(lnode)], rnode, stop)
+        if (ldepth < rdepth):
+            return self.getCommonAncestor(lnode, parents[id(rnode)], stop)
+        return self.getCommonAncestor(parents[id(lnode)], parents[id(rnode)],
+                                      stop)
 
     def descendantOf(self, node, ancestors, stop):
         for a in ancestors:
@@ -404,15 +555,40 @@ class Checker(object):
                 return True
         return False
 
+    def getForkChain(self, node, parent):
+        """
+        Return the chain of IF/TRY forks C{node} is located in.
+
+        Every item of the chain is a C{(fork, child, part)} tuple, outermost
+        fork first, where C{child} is the direct child of the fork on the
+        way to the node and C{part} is the index of the fork alternative
+        containing that child, or C{None}.  All the nodes of a branch share
+        the same chain.
+        """
+        chain = self._forkChains.get(id(parent), ())
+        parts = self._forkParts.get(id(parent))
+        if parts is None:
+            alternatives = getAlternatives(parent)
+            if not alternatives:
+                return chain
+            parts = self._forkParts[id(parent)] = {}
+            for index, items in enumerate(alternatives):
+                for item in items:
+                    parts[id(item)] = index
+        return chain + ((parent, node, parts.get(id(node))),)
+
     def differentForks(self, lnode, rnode):
         """True, if lnode and rnode are located on different forks of IF/TRY"""
-        ancestor = self.getCommonAncestor(lnode, rnode, self.root)
-        parts = getAlternatives(ancestor)
-        if parts:
-            for items in parts:
-                if self.descendantOf(lnode, items, ancestor) ^ \
-                   self.descendantOf(rnode, items, ancestor):
-                    return True
+        lchain = self._forkChains.get(id(lnode), ())
+        rchain = self._forkChains.get(id(rnode), ())
+        for (lfork, lchild, lpart), (rfork, rchild, rpart) in zip(lchain,
+                                                                  rchain):
+            if lfork is not rfork:
+                # the common ancestor is not a fork
+                return False
+            if lchild is not rchild:
+                # the common ancestor is this fork
+                return lpart != rpart
         return False
 
     def addBinding(self, node, value):
@@ -454,12 +630,33 @@ class Checker(object):
 
         self.scope[value.name] = value
 
+    @classmethod
+    def getNodeHandlers(cls):
+        """
+        Return the node handlers dispatch table of this checker class.
+
+        The table maps AST node classes to unbound handlers.  It is built
+        once per class and shared by all its instances.
+        """
+        try:
+            return cls.__dict__['_nodeHandlers']
+        except KeyError:
+            pass
+        handlers = {}
+        for node_class in _astNodeClasses:
+            handler = getattr(cls, getNodeType(node_class), None)
+            if handler is not None:
+                handlers[node_class] = handler
+        cls._nodeHandlers = handlers
+        return handlers
+
     def getNodeHandler(self, node_class):
         try:
             return self._nodeHandlers[node_class]
         except KeyError:
             nodeType = getNodeType(node_class)
-        self._nodeHandlers[node_class] = handler = getattr(self, nodeType)
+        handler = getattr(self.__class__, nodeType)
+        self._nodeHandlers[node_class] = handler
         return handler
 
     def handleNodeLoad(self, node):
@@ -470,7 +667,8 @@ class Checker(object):
         try:
             self.scope[name].used = (self.scope, node)
         except KeyError:
-            pass
+            if name in self.scope.starredNames:
+                return
         else:
             return
 
@@ -486,7 +684,8 @@ class Checker(object):
             try:
                 scope[name].used = (self.scope, node)
             except KeyError:
-                pass
+                if name in scope.starredNames:
+                    return
             else:
                 return
 
@@ -521,13 +720,14 @@ class Checker(object):
                                 scope[name].used[1], name, scope[name].source)
                     break
 
+        parent = self._nodeParents[id(node)]
         parent_stmt = self.getParent(node)
         if isinstance(parent_stmt, (ast.For, ast.comprehension)) or (
-                parent_stmt != node.parent and
+                parent_stmt != parent and
                 not self.isLiteralTupleUnpacking(parent_stmt)):
             binding = Binding(name, node)
         elif name == '__all__' and isinstance(self.scope, ModuleScope):
-            binding = ExportBinding(name, node.parent, self.scope)
+            binding = ExportBinding(name, parent, self.scope)
         else:
             binding = Assignment(name, node)
         self.addBinding(node, binding)
@@ -538,11 +738,11 @@ class Checker(object):
             """
             Return `True` if node is part of a conditional body.
             """
-            current = getattr(node, 'parent', None)
+            current = self._nodeParents.get(id(node))
             while current:
                 if isinstance(current, (ast.If, ast.While, ast.IfExp)):
                     return True
-                current = getattr(current, 'parent', None)
+                current = self._nodeParents.get(id(current))
             return False
 
         name = getNodeName(node)
@@ -587,63 +787,60 @@ class Checker(object):
         if not isinstance(node, ast.Str):
             return (None, None)
         # Computed incorrectly if the docstring has backslash
-        doctest_lineno = node.lineno - node.s.count('\n') - 1
+        lineno = self.getLocation(node).lineno
+        doctest_lineno = lineno - node.s.count('\n') - 1
         return (node.s, doctest_lineno)
 
     def handleNode(self, node, parent):
         if node is None:
             return
         if self.offset and getattr(node, 'lineno', None) is not None:
-            node.lineno += self.offset[0]
-            node.col_offset += self.offset[1]
+            self._nodeOffsets[id(node)] = self.offset
         if self.traceTree:
             print('  ' * self.nodeDepth + node.__class__.__name__)
         if self.futuresAllowed and not (isinstance(node, ast.ImportFrom) or
                                         self.isDocstring(node)):
             self.futuresAllowed = False
         self.nodeDepth += 1
-        node.depth = self.nodeDepth
-        node.parent = parent
+        self._nodeDepths[id(node)] = self.nodeDepth
+        self._nodeParents[id(node)] = parent
+        self._forkChains[id(node)] = self.getForkChain(node, parent)
         try:
             handler = self.getNodeHandler(node.__class__)
-            handler(node)
+            handler(self, node)
         finally:
             self.nodeDepth -= 1
         if self.traceTree:
             print('  ' * self.nodeDepth + 'end ' + node.__class__.__name__)
 
-    _getDoctestExamples = doctest.DocTestParser().get_examples
-
     def handleDoctests(self, node):
         try:
             (docstring, node_lineno) = self.getDocstring(node.body[0])
-            examples = docstring and self._getDoctestExamples(docstring)
-        except (ValueError, IndexError):
-            # e.g. line 6 of the docstring for <string> has inconsistent
-            # leading whitespace: ...
+        except IndexError:
             return
+        examples = docstring and _doctestCache[docstring]
         if not examples:
             return
         node_offset = self.offset or (0, 0)
         self.pushScope()
-        underscore_in_builtins = '_' in self.builtIns
-        if not underscore_in_builtins:
-            self.builtIns.add('_')
-        for example in examples:
-            try:
-                tree = compile(example.source, "<doctest>", "exec", ast.PyCF_ONLY_AST)
-            except SyntaxError:
-                e = sys.exc_info()[1]
-                position = (node_lineno + example.lineno + e.lineno,
-                            example.indent + 4 + (e.offset or 0))
+        builtIns = self.builtIns
+        self.builtIns = getBuiltIns(builtIns, ('_',))
+        for source, lineno, indent, tree, error in examples:
+            if tree is None:
+                position = (node_lineno + lineno + error[0],
+                            indent + 4 + (error[1] or 0))
                 self.report(messages.DoctestSyntaxError, node, position)
             else:
-                self.offset = (node_offset[0] + node_lineno + example.lineno,
-                               node_offset[1] + example.indent + 4)
+                if id(tree) in self._doctestTrees:
+                    # the same docstring again, nodes have other offsets
+                    tree = compile(source, "<doctest>", "exec",
+                                   ast.PyCF_ONLY_AST)
+                self._doctestTrees[id(tree)] = tree
+                self.offset = (node_offset[0] + node_lineno + lineno,
+                               node_offset[1] + indent + 4)
                 self.handleChildren(tree)
                 self.offset = node_offset
-        if not underscore_in_builtins:
-            self.builtIns.remove('_')
+        self.builtIns = builtIns
         self.popScope()
 
     def ignore(self, node):
@@ -725,7 +922,7 @@ class Checker(object):
         if isinstance(node.ctx, (ast.Load, ast.AugLoad)):
             self.handleNodeLoad(node)
             if (node.id == 'locals' and isinstance(self.scope, FunctionScope)
-                    and isinstance(node.parent, ast.Call)):
+                    and isinstance(self._nodeParents[id(node)], ast.Call)):
                 # we are doing locals() call in current scope
                 self.scope.usesLocals = True
         elif isinstance(node.ctx, (ast.Store, ast.AugStore)):
@@ -751,7 +948,8 @@ class Checker(object):
         self.handleNode(node.value, node)
 
     def YIELD(self, node):
-        self.scope.isGenerator = True
+        if isinstance(self.scope, FunctionScope):
+            self.scope.isGenerator = True
         self.handleNode(node.value, node)
 
     AWAIT = YIELDFROM = YIELD
@@ -889,7 +1087,15 @@ class Checker(object):
 
         for alias in node.names:
             if alias.name == '*':
-                self.scope.importStarred = True
+                names = None
+                if self.symbolIndex is not None:
+                    names = self.symbolIndex.exportedNames(
+                        node.module, node.level or 0, self.modulePath)
+                if names is None:
+                    self.scope.importStarred = True
+                else:
+                    self.scope.starredNames = \
+                        self.scope.starredNames.union(names)
                 self.report(messages.ImportStarUsed, node, node.module)
                 continue
             name = alias.asname or alias.name
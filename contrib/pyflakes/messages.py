@@ -4,13 +4,15 @@ Provide the class Message and its subclasses.
 
 
 class Message(object):
+    __slots__ = ('filename', 'lineno', 'col', 'message_args')
+
     message = ''
-    message_args = ()
 
     def __init__(self, filename, loc):
         self.filename = filename
         self.lineno = loc.lineno
         self.col = getattr(loc, 'col_offset', 0)
+        self.message_args = ()
 
     def __str__(self):
         return '%s:%s: %s' % (self.filename, self.lineno,
@@ -18,6 +20,7 @@ class Message(object):
 
 
 class UnusedImport(Message):
+    __slots__ = ()
     message = '%r imported but unused'
 
     def __init__(self, filename, loc, name):
@@ -26,6 +29,7 @@ class UnusedImport(Message):
 
 
 class RedefinedWhileUnused(Message):
+    __slots__ = ()
     message = 'redefinition of unused %r from line %r'
 
     def __init__(self, filename, loc, name, orig_loc):
@@ -34,6 +38,7 @@ class RedefinedWhileUnused(Message):
 
 
 class RedefinedInListComp(Message):
+    __slots__ = ()
     message = 'list comprehension redefines %r from line %r'
 
     def __init__(self, filename, loc, name, orig_loc):
@@ -42,6 +47,7 @@ class RedefinedInListComp(Message):
 
 
 class ImportShadowedByLoopVar(Message):
+    __slots__ = ()
     message = 'import %r from line %r shadowed by loop variable'
 
     def __init__(self, filename, loc, name, orig_loc):
@@ -50,6 +56,7 @@ class ImportShadowedByLoopVar(Message):
 
 
 class ImportStarUsed(Message):
+    __slots__ = ()
     message = "'from %s import *' used; unable to detect undefined names"
 
     def __init__(self, filename, loc, modname):
@@ -58,6 +65,7 @@ class ImportStarUsed(Message):
 
 
 class UndefinedName(Message):
+    __slots__ = ()
     message = 'undefined name %r'
 
     def __init__(self, filename, loc, name):
@@ -66,6 +74,7 @@ class UndefinedName(Message):
 
 
 class DoctestSyntaxError(Message):
+    __slots__ = ()
     message = 'syntax error in doctest'
 
     def __init__(self, filename, loc, position=None):
@@ -76,6 +85,7 @@ class DoctestSyntaxError(Message):
 
 
 class UndefinedExport(Message):
+    __slots__ = ()
     message = 'undefined name %r in __all__'
 
     def __init__(self, filename, loc, name):
@@ -84,6 +94,7 @@ class UndefinedExport(Message):
 
 
 class UndefinedLocal(Message):
+    __slots__ = ()
     message = ('local variable %r (defined in enclosing scope on line %r) '
                'referenced before assignment')
 
@@ -93,6 +104,7 @@ class UndefinedLocal(Message):
 
 
 class DuplicateArgument(Message):
+    __slots__ = ()
     message = 'duplicate argument %r in function definition'
 
     def __init__(self, filename, loc, name):
@@ -101,6 +113,7 @@ class DuplicateArgument(Message):
 
 
 class LateFutureImport(Message):
+    __slots__ = ()
     message = 'future import(s) %r after other statements'
 
     def __init__(self, filename, loc, names):
@@ -113,6 +126,7 @@ class UnusedVariable(Message):
     Indicates that a variable has been explicity assigned to but not actually
     used.
     """
+    __slots__ = ()
     message = 'local variable %r is assigned to but never used'
 
     def __init__(self, filename, loc, names):
@@ -124,6 +138,7 @@ class ReturnWithArgsInsideGenerator(Message):
     """
     Indicates a return statement with arguments inside a generator.
     """
+    __slots__ = ()
     message = '\'return\' with argument inside generator'
 
 
@@ -131,4 +146,5 @@ class ReturnOutsideFunction(Message):
     """
     Indicates a return statement outside of a function/method.
     """
+    __slots__ = ()
     message = '\'return\' outside function'
@@ -0,0 +1,306 @@
+"""
+Index of the names exported by the modules of a workspace.
+
+The index is used by the checker to resolve C{from module import *} to the
+exact names the star import binds.  Modules are parsed once and the result is
+kept in memory and, optionally, in a JSON file on disk.  A module is parsed
+again only when its modification time changes.
+"""
+from __future__ import with_statement
+
+import ast
+import json
+import os
+import tempfile
+
+__all__ = ['SymbolIndex', 'getModuleSymbols']
+
+INDEX_VERSION = 1
+
+
+def getTargetNames(node):
+    """
+    Return the names bound by an assignment target.
+    """
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, (ast.Tuple, ast.List)):
+        names = []
+        for elt in node.elts:
+            names.extend(getTargetNames(elt))
+        return names
+    if hasattr(ast, 'Starred') and isinstance(node, ast.Starred):
+        return getTargetNames(node.value)
+    return []
+
+
+def getLiteralNames(node):
+    """
+    Return the strings of a literal list or tuple, or C{None} if C{node} is
+    anything else.
+    """
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        return None
+    names = []
+    for elt in node.elts:
+        if not isinstance(elt, ast.Str):
+            return None
+        names.append(elt.s)
+    return names
+
+
+def getModuleSymbols(tree):
+    """
+    Collect the names a module exports to C{from module import *}.
+
+    @return: A two-tuple.  The first element is the list of exported names or
+        C{None} if they can not be determined statically, the second is the
+        list of C{(module, level)} pairs of the star imports of the module.
+        Star imports are not followed when the module defines C{__all__}.
+    """
+    names = []
+    stars = []
+    exports = None
+    statements = list(tree.body)
+    while statements:
+        node = statements.pop(0)
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)) or \
+                node.__class__.__name__ == 'AsyncFunctionDef':
+            names.append(node.name)
+            continue
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.append(alias.asname or alias.name.split('.')[0])
+            continue
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if alias.name == '*':
+                    stars.append((node.module, node.level or 0))
+                else:
+                    names.append(alias.asname or alias.name)
+            continue
+        if isinstance(node, ast.Expr) and \
+                isinstance(node.value, ast.Call) and \
+                isinstance(node.value.func, ast.Attribute) and \
+                getattr(node.value.func.value, 'id', None) == '__all__':
+            # __all__.extend(...) and friends
+            return None, []
+        targets = []
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AugAssign) or \
+                node.__class__.__name__ == 'AnnAssign':
+            targets = [node.target]
+        elif isinstance(node, ast.For) or \
+                node.__class__.__name__ == 'AsyncFor':
+            targets = [node.target]
+        elif isinstance(node, ast.With) or \
+                node.__class__.__name__ == 'AsyncWith':
+            items = getattr(node, 'items', [node])
+            targets = [item.optional_vars for item in items
+                       if item.optional_vars is not None]
+        for target in targets:
+            targetNames = getTargetNames(target)
+            if '__all__' not in targetNames:
+                names.extend(targetNames)
+                continue
+            # only a literal __all__ assignment can be understood
+            literal = None
+            if isinstance(node, ast.Assign) and target is node.targets[0] \
+                    and isinstance(target, ast.Name):
+                literal = getLiteralNames(node.value)
+                if literal is not None:
+                    exports = literal
+            elif isinstance(node, ast.AugAssign) and exports is not None:
+                literal = getLiteralNames(node.value)
+                if literal is not None:
+                    exports = exports + literal
+            if literal is None:
+                return None, []
+        # module level names are also bound in the bodies of compound
+        # statements, but not in function and class bodies
+        nested = []
+        for field in ('body', 'handlers', 'orelse', 'finalbody'):
+            for child in getattr(node, field, None) or ():
+                if isinstance(child, ast.stmt) or \
+                        isinstance(child, ast.excepthandler):
+                    nested.append(child)
+        statements[0:0] = nested
+    if exports is not None:
+        return exports, []
+    return [name for name in names if not name.startswith('_')], stars
+
+
+class SymbolIndex(object):
+    """
+    I map module names to the names they export for star imports.
+
+    Only the modules found under the given roots are indexed, anything else
+    (the standard library, third party packages) is unknown to the index and
+    the checker keeps treating such star imports as unresolvable.
+
+    @ivar roots: Directories the absolute module names are looked up in, in
+        order, like C{sys.path}.
+
+    @ivar path: Path of the JSON file the index is kept in between runs, or
+        C{None} to keep the index in memory only.
+
+    @ivar _entries: Modules scanned so far, keyed by their absolute file name.
+        Every entry is a three-tuple of the modification time of the file, the
+        exported names (or C{None}) and the star imports of the module, see
+        L{getModuleSymbols}.
+    """
+
+    def __init__(self, roots, path=None):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        if path:
+            self.load()
+
+    def load(self):
+        """
+        Read the index file, ignoring it if it is missing or unreadable.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if not isinstance(data, dict) or \
+                data.get('version') != INDEX_VERSION:
+            return
+        for filename, entry in data.get('modules', {}).items():
+            try:
+                mtime, names, stars = entry
+                self._entries[filename] = (
+                    mtime,
+                    None if names is None else frozenset(names),
+                    tuple((module, level) for module, level in stars),
+                )
+            except (TypeError, ValueError):
+                continue
+
+    def save(self):
+        """
+        Write the index file if any module was scanned since the last save.
+
+        The file is written to a temporary file which is renamed over the
+        index, so other processes never read a partially written index.
+        """
+        if not self.path or not self._dirty:
+            return
+        modules = {}
+        for filename, (mtime, names, stars) in self._entries.items():
+            modules[filename] = [
+                mtime,
+                None if names is None else sorted(names),
+                [list(star) for star in stars],
+            ]
+        data = {'version': INDEX_VERSION, 'modules': modules}
+        directory = os.path.dirname(self.path)
+        try:
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tempPath = tempfile.mkstemp(
+                prefix=os.path.basename(self.path) + '.', suffix='.tmp',
+                dir=directory or None)
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            # os.rename does not replace an existing file on Windows
+            getattr(os, 'replace', os.rename)(tempPath, self.path)
+        except (IOError, OSError):
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            return
+        self._dirty = False
+
+    def findModule(self, module, level=0, filename=None):
+        """
+        Return the file name of a module, or C{None} if it is not in the
+        workspace.
+
+        @param level: Level of a relative import, resolved against the
+            directory of C{filename}.
+        """
+        parts = module.split('.') if module else []
+        if level:
+            if not filename:
+                return None
+            base = os.path.dirname(os.path.abspath(filename))
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            bases = [base]
+        else:
+            bases = self.roots
+        for base in bases:
+            path = os.path.join(base, *parts)
+            if parts and os.path.isfile(path + '.py'):
+                return path + '.py'
+            path = os.path.join(path, '__init__.py')
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def getEntry(self, filename):
+        """
+        Return the index entry of a module file, scanning the file if it has
+        been modified since it was indexed.
+        """
+        try:
+            mtime = os.path.getmtime(filename)
+        except OSError:
+            if self._entries.pop(filename, None) is not None:
+                self._dirty = True
+            return None
+        entry = self._entries.get(filename)
+        if entry is not None and entry[0] == mtime:
+            return entry
+        try:
+            with open(filename, 'rb') as f:
+                source = f.read()
+            tree = compile(source, filename, 'exec', ast.PyCF_ONLY_AST)
+        except (IOError, OSError, SyntaxError, TypeError, ValueError):
+            names, stars = None, []
+        else:
+            names, stars = getModuleSymbols(tree)
+        entry = (
+            mtime,
+            None if names is None else frozenset(names),
+            tuple(stars),
+        )
+        self._entries[filename] = entry
+        self._dirty = True
+        return entry
+
+    def exportedNames(self, module, level=0, filename=None, _seen=None):
+        """
+        Return the names bound by C{from module import *}, or C{None} if they
+        can not be determined.
+
+        @param filename: The file the import statement is in.
+        """
+        path = self.findModule(module, level, filename)
+        if path is None:
+            return None
+        if _seen is None:
+            _seen = set()
+        if path in _seen:
+            return frozenset()
+        _seen.add(path)
+        entry = self.getEntry(path)
+        if entry is None or entry[1] is None:
+            return None
+        names = entry[1]
+        for starModule, starLevel in entry[2]:
+            starNames = self.exportedNames(starModule, starLevel, path, _seen)
+            if starNames is None:
+                return None
+            names = names.union(starNames)
+        return names
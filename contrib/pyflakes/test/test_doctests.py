@@ -102,6 +102,41 @@ class Test(TestCase):
         self.assertEqual(exc.lineno, 5)
         self.assertEqual(exc.col, 20)
 
+    def test_offsetInRepeatedDoctests(self):
+        """
+        The same doctest in another docstring is reported at its own line.
+        """
+        (exc1, exc2) = self.flakes('''
+
+        def doctest_stuff():
+            """
+                >>> import foo # line 5
+            """
+
+        def doctest_other_stuff():
+            """
+                >>> import foo # line 5
+            """
+        ''', m.UnusedImport, m.UnusedImport).messages
+        self.assertEqual(exc1.lineno, 5)
+        self.assertEqual(exc2.lineno, 10)
+
+    def test_cachedDoctestNotModified(self):
+        """
+        Cached doctest ASTs are shared by checkers and never modified.
+        """
+        source = '''
+
+        def doctest_stuff():
+            """
+                >>> x # line 5
+            """
+        '''
+        for i in range(2):
+            exc = self.flakes(source, m.UndefinedName).messages[0]
+            self.assertEqual(exc.lineno, 5)
+            self.assertEqual(exc.col, 12)
+
     def test_offsetAfterDoctests(self):
         exc = self.flakes('''
 
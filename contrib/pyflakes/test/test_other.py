@@ -2,9 +2,11 @@
 Tests for various Pyflakes behavior.
 """
 
+import ast
+import textwrap
 from sys import version_info
 
-from pyflakes import messages as m
+from pyflakes import checker, messages as m
 from pyflakes.test.harness import TestCase, skip, skipIf
 
 
@@ -185,6 +187,15 @@ class Test(TestCase):
             def a(): pass
         ''', m.RedefinedWhileUnused)
 
+    def test_redefinedManyTimesInIfElse(self):
+        """
+        Test that a generated module with many redefinitions in the if and
+        else blocks warns only about the redefinitions inside each block.
+        """
+        body = ['    def a(): pass'] * 500
+        self.flakes('\n'.join(['if True:'] + body + ['else:'] + body),
+                    *[m.RedefinedWhileUnused] * 998)
+
     def test_redefinedTryExceptFunction(self):
         """
         Test that shadowing a function definition twice in try
@@ -485,6 +496,45 @@ class Test(TestCase):
         def g(): foo = 'anything'; foo.is_used()
         ''')
 
+    def test_nodeHandlersSharedByInstances(self):
+        """
+        The node handlers dispatch table is built once per checker class.
+        """
+        first = self.flakes('a = 1')
+        second = self.flakes('b = 2')
+        self.assertIs(first._nodeHandlers, second._nodeHandlers)
+        self.assertIs(first._nodeHandlers, checker.Checker.getNodeHandlers())
+
+    def test_treeNodesNotModified(self):
+        """
+        Parents and depths of the nodes are not stored on the tree itself.
+        """
+        w = self.flakes('''
+        if x:
+            a = 1
+        else:
+            a = 2
+        ''', m.UndefinedName)
+        for node in ast.walk(w.root):
+            self.assertFalse(hasattr(node, 'parent'))
+            self.assertFalse(hasattr(node, 'depth'))
+
+    def test_noInstanceDicts(self):
+        """
+        Bindings, scopes and messages are slotted and carry no C{__dict__}.
+        """
+        w = self.flakes('''
+        import os
+        def f():
+            x = 1
+        ''', m.UnusedImport, m.UnusedVariable)
+        for message in w.messages:
+            self.assertFalse(hasattr(message, '__dict__'))
+        for scope in w.deadScopes:
+            self.assertFalse(hasattr(scope, '__dict__'))
+            for binding in scope.values():
+                self.assertFalse(hasattr(binding, '__dict__'))
+
 
 class TestUnusedAssignment(TestCase):
     """
@@ -985,6 +1035,18 @@ class TestUnusedAssignment(TestCase):
             yield from foo()
         ''', m.UndefinedName)
 
+    @skipIf(version_info >= (3, 8), 'SyntaxError since Python 3.8')
+    def test_yieldInComprehension(self):
+        """
+        Do not crash on C{yield} inside a comprehension scope.
+        """
+        self.flakes('''
+        def f(y):
+            [(yield x) for x in y]
+            {(yield x) for x in y}
+            ((yield x) for x in y)
+        ''')
+
     def test_returnOnly(self):
         """Do not crash on lone "return"."""
         self.flakes('return 2')
@@ -1006,6 +1068,16 @@ class TestAsyncStatements(TestCase):
             await db.fetch('SELECT ...')
         ''')
 
+    @skipIf(version_info < (3, 6), 'new in Python 3.6')
+    def test_asyncDefAwaitInComprehension(self):
+        """
+        Do not crash on C{await} inside a comprehension scope.
+        """
+        self.flakes('''
+        async def read_all(futures):
+            return [await future for future in futures]
+        ''')
+
     @skipIf(version_info < (3, 5), 'new in Python 3.5')
     def test_asyncDefUndefined(self):
         self.flakes('''
@@ -1040,3 +1112,172 @@ class TestAsyncStatements(TestCase):
                 ...
                 await trans.end()
         ''')
+
+
+class AncestorForksChecker(checker.Checker):
+    """
+    Checker comparing C{differentForks} with the walk over the common
+    ancestor it replaced.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.forkResults = []
+        super(AncestorForksChecker, self).__init__(*args, **kwargs)
+
+    def differentForks(self, lnode, rnode):
+        result = super(AncestorForksChecker, self).differentForks(lnode,
+                                                                  rnode)
+        expected = False
+        ancestor = self.getCommonAncestor(lnode, rnode, self.root)
+        parts = checker.getAlternatives(ancestor)
+        if parts:
+            for items in parts:
+                if self.descendantOf(lnode, items, ancestor) ^ \
+                   self.descendantOf(rnode, items, ancestor):
+                    expected = True
+                    break
+        self.forkResults.append((result, expected))
+        return result
+
+
+class TestForks(TestCase):
+    """
+    Tests for redefinitions in the forks of IF/TRY statements.
+    """
+
+    def flakes(self, input, *expectedOutputs, **kw):
+        kw.setdefault('builtins', ['a', 'b', 'c'])
+        w = super(TestForks, self).flakes(input, *expectedOutputs, **kw)
+        tree = ast.parse(textwrap.dedent(input))
+        forks = AncestorForksChecker(tree, **kw)
+        self.assertTrue(forks.forkResults)
+        for result, expected in forks.forkResults:
+            self.assertEqual(result, expected)
+        return w
+
+    def test_nestedIfElse(self):
+        self.flakes('''
+        if a:
+            if b:
+                import os
+            elif c:
+                import os
+            else:
+                import os
+        else:
+            if b:
+                import os
+            else:
+                import os
+        os.path
+        ''')
+
+    def test_nestedIfSameBranch(self):
+        self.flakes('''
+        if a:
+            pass
+        else:
+            if b:
+                import os
+                import os
+            else:
+                import os
+        os.path
+        ''', m.RedefinedWhileUnused)
+
+    def test_nestedIfAfterFork(self):
+        self.flakes('''
+        if a:
+            if b:
+                import os
+            else:
+                import os
+            import os
+        os.path
+        ''', m.RedefinedWhileUnused)
+
+    def test_ifTestAndBody(self):
+        self.flakes('''
+        import os
+        if os:
+            def f(): pass
+        else:
+            def f(): pass
+        def f(): pass
+        ''', m.RedefinedWhileUnused)
+
+    def test_nestedTryExcept(self):
+        self.flakes('''
+        try:
+            from a import x
+        except ImportError:
+            try:
+                from b import x
+            except ImportError:
+                x = None
+        x
+        ''')
+
+    def test_tryExceptElse(self):
+        self.flakes('''
+        try:
+            import os
+        except ImportError:
+            if a:
+                import os
+            else:
+                os = None
+        else:
+            import os
+        os.path
+        ''')
+
+    def test_tryElseSameBranch(self):
+        self.flakes('''
+        try:
+            pass
+        except ImportError:
+            import os
+        else:
+            import os
+            if a:
+                pass
+            import os
+        os.path
+        ''', m.RedefinedWhileUnused)
+
+    def test_ifInTryExcept(self):
+        self.flakes('''
+        try:
+            if a:
+                def f(): pass
+            else:
+                def f(): pass
+        except ImportError:
+            def f(): pass
+        except ValueError:
+            def f(): pass
+            def f(): pass
+        ''', m.RedefinedWhileUnused)
+
+    def test_tryFinally(self):
+        self.flakes('''
+        try:
+            import os
+        finally:
+            import os
+        os.path
+        ''')
+
+    def test_forksInFunction(self):
+        self.flakes('''
+        def f(a):
+            if a:
+                import os
+            else:
+                try:
+                    import os
+                except ImportError:
+                    import os
+            return os
+        ''')
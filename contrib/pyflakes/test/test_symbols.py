@@ -0,0 +1,204 @@
+"""
+Tests for resolving star imports with L{pyflakes.symbols.SymbolIndex}.
+"""
+import os
+import shutil
+import tempfile
+import textwrap
+
+from pyflakes import messages as m
+from pyflakes.symbols import SymbolIndex
+from pyflakes.test.harness import TestCase
+
+
+class TestSymbolIndex(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = SymbolIndex([self.root])
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def makeModule(self, name, source, mtime=None):
+        path = os.path.join(self.root, *name.split('/'))
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, 'w') as f:
+            f.write(textwrap.dedent(source))
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_publicNames(self):
+        """
+        Without C{__all__} the public module level names are exported.
+        """
+        self.makeModule('mod.py', '''
+        import os
+        from sys import path as _path
+        a, (b, _c) = 1, (2, 3)
+        def f():
+            inner = 1
+        class C:
+            attr = 1
+        if a:
+            d = 1
+        else:
+            e = 2
+        try:
+            g = 1
+        except ImportError:
+            h = 1
+        ''')
+        self.assertEqual(self.index.exportedNames('mod'),
+                         frozenset(['os', 'a', 'b', 'f', 'C', 'd', 'e',
+                                    'g', 'h']))
+
+    def test_all(self):
+        """
+        A literal C{__all__} defines the exported names.
+        """
+        self.makeModule('pkg/__init__.py', '''
+        __all__ = ['a', '_b']
+        __all__ += ['c']
+        a = _b = c = d = 1
+        ''')
+        self.assertEqual(self.index.exportedNames('pkg'),
+                         frozenset(['a', '_b', 'c']))
+
+    def test_dynamicAll(self):
+        """
+        An C{__all__} which can not be read statically is unresolvable.
+        """
+        self.makeModule('mod.py', '''
+        import other
+        __all__ = ['a'] + other.__all__
+        ''')
+        self.makeModule('mod2.py', '''
+        __all__ = ['a']
+        __all__.extend(['b'])
+        ''')
+        self.assertIs(self.index.exportedNames('mod'), None)
+        self.assertIs(self.index.exportedNames('mod2'), None)
+
+    def test_unknownModule(self):
+        """
+        Modules outside of the roots are unknown.
+        """
+        self.assertIs(self.index.exportedNames('os'), None)
+
+    def test_nestedStarImports(self):
+        """
+        Star imports of the indexed modules are followed, also cyclic and
+        relative ones.
+        """
+        self.makeModule('pkg/__init__.py', '')
+        self.makeModule('pkg/a.py', '''
+        from .b import *
+        a = 1
+        ''')
+        self.makeModule('pkg/b.py', '''
+        from pkg.a import *
+        b = 1
+        ''')
+        self.assertEqual(self.index.exportedNames('pkg.a'),
+                         frozenset(['a', 'b']))
+
+    def test_relativeImport(self):
+        """
+        Relative star imports are resolved against the importing file.
+        """
+        self.makeModule('pkg/__init__.py', 'p = 1')
+        self.makeModule('pkg/sub/__init__.py', '')
+        self.makeModule('pkg/sub/mod.py', 'm = 1')
+        filename = os.path.join(self.root, 'pkg', 'sub', 'x.py')
+        self.assertEqual(self.index.exportedNames('mod', 1, filename),
+                         frozenset(['m']))
+        self.assertEqual(self.index.exportedNames(None, 2, filename),
+                         frozenset(['p']))
+
+    def test_incrementalUpdate(self):
+        """
+        Modules are scanned again only when their mtime changes.
+        """
+        path = self.makeModule('mod.py', 'a = 1', mtime=1000)
+        self.assertEqual(self.index.exportedNames('mod'), frozenset(['a']))
+        self.makeModule('mod.py', 'b = 1', mtime=1000)
+        self.assertEqual(self.index.exportedNames('mod'), frozenset(['a']))
+        os.utime(path, (2000, 2000))
+        self.assertEqual(self.index.exportedNames('mod'), frozenset(['b']))
+
+    def test_persistence(self):
+        """
+        The index is saved to disk and read back by another index.
+        """
+        self.makeModule('mod.py', 'a = 1', mtime=1000)
+        path = os.path.join(self.root, 'cache', 'symbols.json')
+        index = SymbolIndex([self.root], path)
+        self.assertEqual(index.exportedNames('mod'), frozenset(['a']))
+        index.save()
+        self.assertTrue(os.path.isfile(path))
+        # the saved entry is used while the mtime is unchanged
+        self.makeModule('mod.py', 'b = 1', mtime=1000)
+        index = SymbolIndex([self.root], path)
+        self.assertEqual(index.exportedNames('mod'), frozenset(['a']))
+
+    def test_checkerResolvesStarImport(self):
+        """
+        Names of a resolved star import are defined, others are undefined.
+        """
+        self.makeModule('mod.py', '''
+        __all__ = ['a', 'b']
+        a = b = 1
+        ''')
+        self.flakes('''
+        from mod import *
+        a, b
+        ''', m.ImportStarUsed, symbolIndex=self.index)
+        self.flakes('''
+        from mod import *
+        a, c
+        ''', m.ImportStarUsed, m.UndefinedName, symbolIndex=self.index)
+        self.flakes('''
+        from mod import *
+        __all__ = ['a', 'c']
+        ''', m.ImportStarUsed, m.UndefinedExport, symbolIndex=self.index)
+
+    def test_checkerModulePath(self):
+        """
+        Relative star imports are resolved against C{modulePath}, while
+        C{__all__} is checked as the file name is not C{__init__.py}.
+        """
+        self.makeModule('pkg/mod.py', 'a = 1')
+        modulePath = os.path.join(self.root, 'pkg', '__init__.py')
+        self.flakes('''
+        from .mod import *
+        __all__ = ['a', 'c']
+        ''', m.ImportStarUsed, m.UndefinedExport, symbolIndex=self.index,
+            modulePath=modulePath)
+
+    def test_saveReplacesIndex(self):
+        """
+        Saving replaces the index file and leaves no temporary files.
+        """
+        directory = os.path.join(self.root, 'cache')
+        path = os.path.join(directory, 'symbols.json')
+        for name, mtime in (('a', 1000), ('b', 2000)):
+            self.makeModule('mod.py', name + ' = 1', mtime=mtime)
+            index = SymbolIndex([self.root], path)
+            index.exportedNames('mod')
+            index.save()
+        self.assertEqual(os.listdir(directory), ['symbols.json'])
+        self.assertEqual(SymbolIndex([self.root], path).exportedNames('mod'),
+                         frozenset(['b']))
+
+    def test_checkerUnresolvedStarImport(self):
+        """
+        Star imports the index does not know keep hiding undefined names.
+        """
+        self.flakes('''
+        from os import *
+        undefined
+        ''', m.ImportStarUsed, symbolIndex=self.index)
@@ -33,6 +33,21 @@ class Test(TestCase):
     def test_builtins(self):
         self.flakes('range(10)')
 
+    def test_extraBuiltins(self):
+        """
+        Extra built-ins passed to the checker are used by that check only.
+        """
+        self.flakes('foo', builtins=['foo'])
+        self.flakes('foo', m.UndefinedName)
+
+    def test_extraBuiltinsInterned(self):
+        """
+        Checkers with the same extra built-ins share the same names set.
+        """
+        first = self.flakes('foo', builtins=['foo'])
+        second = self.flakes('foo', builtins=('foo',))
+        self.assertIs(first.builtIns, second.builtIns)
+
     def test_builtinWindowsError(self):
         """
         C{WindowsError} is sometimes a builtin name, so no warning is emitted
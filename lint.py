@@ -5,6 +5,8 @@ from __future__ import print_function
 import ast
 import os
 import sys
+import time
+from ast import iter_child_nodes
 
 try:
     from configparser import RawConfigParser
@@ -40,7 +42,7 @@ from pyflakes import (
     __version__ as pyflakes_version,
     checker as pyflakes_checker
 )
-import pyflakes.api
+from pyflakes.symbols import SymbolIndex
 
 patch_pyflakes()
 
@@ -53,6 +55,27 @@ else:
     )
 CONFIG_FILES = ('setup.cfg', 'tox.ini', '.pep8')
 
+# star imports symbol indexes, by project roots and index file path
+SYMBOL_INDEXES = {}
+
+# mccabe complexities of functions, by function source hash
+COMPLEXITY_CACHE = mccabe.ComplexityCache()
+
+# complexity tables of the last lint, by file name
+COMPLEXITY_TABLES = {}
+
+# AST node types checked by pep8-naming
+NAMING_NODE_TYPES = frozenset(['ClassDef', 'FunctionDef']).union(
+    name for name in dir(ast)
+    if isinstance(getattr(ast, name), type) and
+    issubclass(getattr(ast, name), ast.AST) and
+    any(hasattr(visitor, 'visit_' + name.lower())
+        for visitor in pep8ext_naming.BaseASTCheck._checks)
+)
+
+# AST node types debugger statements are looked for in
+DEBUGGER_NODE_TYPES = ('Import', 'ImportFrom', 'Call')
+
 
 def tools_versions():
     """Return all lint tools versions."""
@@ -146,6 +169,166 @@ class ImportOrderLinter(ImportOrderChecker):
             yield error
 
 
+class TreeWalker(object):
+    """Walk AST once and pass every node to the handlers of AST checkers.
+
+    Handlers are registered for node class names or for all nodes. 'enter'
+    handlers are called before node children are walked, 'leave' handlers
+    are called after that. 'parents' list holds the ancestors of the node
+    passed to 'enter' handlers.
+    """
+
+    def __init__(self):
+        """Initialize walker."""
+        self.parents = []
+        self._registry = []
+        self._handlers = {}
+
+    def register(self, enter=None, leave=None, node_types=None):
+        """Register node handlers for node types (all nodes if None)."""
+        if node_types is not None:
+            node_types = frozenset(node_types)
+        self._registry.append((enter, leave, node_types))
+        self._handlers.clear()
+
+    def get_handlers(self, node_class):
+        """Return 'enter' and 'leave' handlers of node class."""
+        handlers = self._handlers.get(node_class)
+        if handlers is None:
+            name = node_class.__name__
+            registry = [
+                (enter, leave) for enter, leave, node_types in self._registry
+                if node_types is None or name in node_types
+            ]
+            handlers = self._handlers[node_class] = (
+                [enter for enter, __ in registry if enter is not None],
+                [leave for __, leave in registry if leave is not None],
+            )
+        return handlers
+
+    def walk(self, tree):
+        """Walk tree in preorder, children in 'ast.iter_child_nodes' order."""
+        get_handlers = self.get_handlers
+        parents = self.parents
+        del parents[:]
+        stack = [(tree, 0, False)]
+        while stack:
+            node, depth, leaving = stack.pop()
+            enter, leave = get_handlers(node.__class__)
+            if leaving:
+                for handler in leave:
+                    handler(node)
+                continue
+
+            del parents[depth:]
+            for handler in enter:
+                handler(node)
+            if leave:
+                stack.append((node, depth, True))
+
+            children = list(iter_child_nodes(node))
+            if children:
+                parents.append(node)
+                depth += 1
+                children.reverse()
+                stack.extend((child, depth, False) for child in children)
+
+
+class VisitorHandlers(object):
+    """Drive 'enter'/'leave' visitor by the nodes of shared tree walk.
+
+    Visitor walks only a part of the tree: nodes are passed to it only if
+    'enter' of their parent returned them.
+    """
+
+    def __init__(self, visitor, tree):
+        """Initialize handlers."""
+        self.visitor = visitor
+        self.expected = set([id(tree)])
+        self.entered = set()
+
+    def enter(self, node):
+        """Pass node to visitor if it is expected."""
+        node_id = id(node)
+        if node_id not in self.expected:
+            return
+        self.expected.discard(node_id)
+        children = self.visitor.enter(node)
+        if children is None:
+            return
+        self.entered.add(node_id)
+        self.expected.update(id(child) for child in children)
+
+    def leave(self, node):
+        """Pass node to visitor if it was entered."""
+        node_id = id(node)
+        if node_id in self.entered:
+            self.entered.discard(node_id)
+            self.visitor.leave(node)
+
+    def leave_node_types(self):
+        """Return node types visitor has 'leave' methods for."""
+        return [
+            name[5:] for name in dir(self.visitor)
+            if name.startswith('leave') and name != 'leave'
+        ]
+
+
+def get_symbol_index(roots, path=None):
+    """Return symbol index to resolve star imports in project roots."""
+    key = (tuple(roots), path)
+    index = SYMBOL_INDEXES.get(key)
+    if index is None:
+        index = SYMBOL_INDEXES[key] = SymbolIndex(roots, path)
+    return index
+
+
+def complexity_table(filename):
+    """Return complexity table of the last file lint.
+
+    Table rows are (line, name, complexity, exact) tuples, the most complex
+    functions first. Complexity is a lower bound if 'exact' is False.
+    """
+    return COMPLEXITY_TABLES.get(filename) or []
+
+
+def forget_complexity_table(filename):
+    """Forget complexity table of the file (i.e. file was closed)."""
+    COMPLEXITY_TABLES.pop(filename, None)
+
+
+def build_complexity_table(graphs):
+    """Build complexity table from mccabe graphs."""
+    table = [
+        (graph.lineno, graph.entity, graph.complexity(), graph.exact)
+        for graph in graphs
+    ]
+    table.sort(key=lambda row: (-row[2], row[0]))
+    return table
+
+
+class Stopwatch(object):
+    """Measure lint phases durations.
+
+    Durations (in seconds) are added to 'timings' dict, nothing is
+    collected if it is None.
+    """
+
+    def __init__(self, timings=None):
+        """Start stopwatch."""
+        self.timings = timings
+        self.start = time.time()
+
+    def lap(self, phase):
+        """Add time since the previous lap to phase and start next lap."""
+        now = time.time()
+        if self.timings is not None:
+            self.timings[phase] = (
+                self.timings.get(phase, 0.0) + now - self.start
+            )
+        self.start = now
+
+
 def load_flake8_config(filename, global_config=False, project_config=False):
     """Return flake8 settings from config file.
 
@@ -188,9 +371,13 @@ def load_flake8_config(filename, global_config=False, project_config=False):
     return result
 
 
-def lint(lines, settings):
-    """Run flake8 lint with internal interpreter."""
+def lint(lines, settings, timings=None):
+    """Run flake8 lint with internal interpreter.
+
+    If 'timings' dict is given, checkers durations are added to it.
+    """
     warnings = []
+    stopwatch = Stopwatch(timings)
 
     # lint with pep8
     if settings.get('pep8', True):
@@ -201,18 +388,12 @@ def lint(lines, settings):
         )
         pep8style.input_file(filename=None, lines=lines.splitlines(True))
         warnings.extend(pep8style.options.report.errors)
-
-    if settings.get('pydocstyle', False):
-        for error in PEP257Checker().check_source(lines, ''):
-            warnings.append((
-                getattr(error, 'line', 0),
-                0,
-                getattr(error, 'message', '')
-            ))
+        stopwatch.lap('pep8')
 
     try:
         tree = compile(lines, '', 'exec', ast.PyCF_ONLY_AST, True)
     except (SyntaxError, TypeError):
+        tree = None
         (exc_type, exc) = sys.exc_info()[:2]
         if len(exc.args) > 1:
             offset = exc.args[1]
@@ -226,45 +407,76 @@ def lint(lines, settings):
             offset[1] or 0,
             'E901 %s: %s' % (exc_type.__name__, exc.args[0])
         ))
-    else:
+    stopwatch.lap('parse')
+
+    # lint with pydocstyle, reuse module AST if it is compiled
+    if settings.get('pydocstyle', False):
+        for error in PEP257Checker().check_source(lines, '', tree):
+            warnings.append((
+                getattr(error, 'line', 0),
+                0,
+                getattr(error, 'message', '')
+            ))
+        stopwatch.lap('pydocstyle')
+
+    if tree is not None:
         # lint with pyflakes
         if settings.get('pyflakes', True):
             builtins = settings.get('builtins')
-            if builtins:  # builtins is extended
-                # some magic (ok, ok, monkey-patching) goes here
-                pyflakes.checker.Checker.builtIns = (
-                    pyflakes.checker.Checker.builtIns.union(builtins)
+            symbol_index = None
+            if settings.get('symbol_index_roots'):
+                symbol_index = get_symbol_index(
+                    settings['symbol_index_roots'],
+                    settings.get('symbol_index_path')
                 )
-            w = pyflakes_checker.Checker(tree)
+            w = pyflakes_checker.Checker(
+                tree, builtins=builtins, symbolIndex=symbol_index,
+                modulePath=settings.get('filename')
+            )
+            if symbol_index is not None:
+                symbol_index.save()
             w.messages.sort(key=lambda m: m.lineno)
 
             reporter = FlakesReporter()
             for warning in w.messages:
                 reporter.flake(warning)
             warnings.extend(reporter.errors)
+            stopwatch.lap('pyflakes')
+
+        # AST checkers below share one tree walk
+        walker = TreeWalker()
 
         # lint with naming
+        naming_errors = []
         if settings.get('naming', True):
-            checker = pep8ext_naming.NamingChecker(tree, None)
-            for error in checker.run():
-                warnings.append(error[0:3])
+            naming_checker = pep8ext_naming.NamingChecker(tree, None)
+            naming_checker.parents = walker.parents
+            walker.register(
+                lambda node: naming_errors.extend(
+                    naming_checker.visit_node(node)
+                ),
+                node_types=NAMING_NODE_TYPES
+            )
 
         # lint with flake8-debugger
+        debugger_detector = None
         if settings.get('debugger', True):
-            debug_warns = flake8_debugger.check_tree_for_debugger_statements(
-                tree, []
-            )
-            for warn in debug_warns:
-                warnings.append(
-                    (warn.get("line"), warn.get("col"), warn.get("message"))
-                )
+            debugger_detector = flake8_debugger.DebuggerDetector()
+            walker.register(debugger_detector.visit,
+                            node_types=DEBUGGER_NODE_TYPES)
 
         # lint with import order
+        import_linter = None
         if settings.get('import_order', False):
             order_style = settings.get('import_order_style')
             import_linter = ImportOrderLinter(tree, None, lines, order_style)
-            for error in import_linter.run():
-                warnings.append(error[0:3])
+            import_visitor = import_linter.visitor_class(
+                None, import_linter.options
+            )
+            walker.register(import_visitor.visit_Import,
+                            node_types=('Import',))
+            walker.register(import_visitor.visit_ImportFrom,
+                            node_types=('ImportFrom',))
 
         # check complexity
         try:
@@ -272,17 +484,61 @@ def lint(lines, settings):
         except (TypeError, ValueError):
             complexity = -1
 
+        mccabe_checker = None
         if complexity > -1:
-            mccabe.McCabeChecker.max_complexity = complexity
-            checker = mccabe.McCabeChecker(tree, None)
-            for error in checker.run():
+            # complexity cache needs the same line numbers as AST has
+            source_lines = lines.replace('\r\n', '\n')
+            if '\r' in source_lines:
+                source_lines = None
+            else:
+                source_lines = source_lines.split('\n')
+            mccabe_checker = mccabe.McCabeChecker(
+                tree, None, complexity, source_lines, COMPLEXITY_CACHE
+            )
+            mccabe_handlers = VisitorHandlers(mccabe_checker.get_visitor(),
+                                              tree)
+            walker.register(mccabe_handlers.enter)
+            walker.register(leave=mccabe_handlers.leave,
+                            node_types=mccabe_handlers.leave_node_types())
+
+        walker.walk(tree)
+        # naming, debugger, import order and complexity checkers
+        stopwatch.lap('ast checkers')
+
+        for error in naming_errors:
+            warnings.append(error[0:3])
+
+        if debugger_detector is not None:
+            for warn in debugger_detector.get_errors():
+                warnings.append(
+                    (warn.get("line"), warn.get("col"), warn.get("message"))
+                )
+
+        if import_linter is not None:
+            for error in import_linter.check_imports_order(import_visitor):
                 warnings.append(error[0:3])
+            stopwatch.lap('import order')
+
+        if mccabe_checker is not None:
+            mccabe_checker.get_visitor().walked = True
+            for error in mccabe_checker.run():
+                warnings.append(error[0:3])
+            COMPLEXITY_TABLES[settings.get('filename')] = (
+                build_complexity_table(mccabe_checker.get_graphs(exact=True))
+            )
+            stopwatch.lap('complexity')
 
     return sorted(warnings, key=lambda e: '{0:09d}{1:09d}'.format(e[0], e[1]))
 
 
-def lint_external(lines, settings, interpreter, linter):
-    """Run flake8 lint with external interpreter."""
+def lint_external(lines, settings, interpreter, linter, timings=None,
+                  complexity_table=True):
+    """Run flake8 lint with external interpreter.
+
+    If 'timings' dict is given, checkers durations measured by external
+    interpreter and the whole subprocess run duration are added to it.
+    Complexity table is not built if 'complexity_table' is False.
+    """
     import subprocess
 
     # first argument is interpreter
@@ -295,6 +551,14 @@ def lint_external(lines, settings, interpreter, linter):
         if builtins:
             arguments.append('--builtins')
             arguments.append(','.join(builtins))
+        symbol_index_roots = settings.get('symbol_index_roots')
+        if symbol_index_roots:
+            arguments.extend(('--filename', settings.get('filename', '')))
+            arguments.append('--symbol-index-roots')
+            arguments.append(os.pathsep.join(symbol_index_roots))
+            if settings.get('symbol_index_path'):
+                arguments.append('--symbol-index-path')
+                arguments.append(settings['symbol_index_path'])
 
     # do we need to run pep8 lint
     if settings.get('pep8', True):
@@ -329,6 +593,17 @@ def lint_external(lines, settings, interpreter, linter):
     # do we need to run complexity check
     complexity = settings.get('complexity', -1)
     arguments.extend(('--complexity', str(complexity)))
+    try:
+        complexity_check = complexity_table and int(complexity) > -1
+    except (TypeError, ValueError):
+        complexity_check = False
+    if complexity_check:
+        arguments.append('--complexity-table')
+    table = []
+
+    # do we need to measure checkers
+    if timings is not None:
+        arguments.append('--timings')
 
     # place for warnings =)
     warnings = []
@@ -339,6 +614,7 @@ def lint_external(lines, settings, interpreter, linter):
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
     # run subprocess
+    stopwatch = Stopwatch(timings)
     proc = subprocess.Popen(
         arguments,
         stdout=subprocess.PIPE,
@@ -347,10 +623,26 @@ def lint_external(lines, settings, interpreter, linter):
         startupinfo=startupinfo
     )
     result = proc.communicate(input=lines.encode('utf-8'))[0]
+    stopwatch.lap('external')
 
     # parse STDOUT for warnings and errors
     for line in result.splitlines():
         line = line.decode('utf-8').strip()
+        if line.startswith('complexity:'):
+            row = line.split(':', 4)
+            try:
+                table.append((int(row[1]), row[4], int(row[2]), row[3] == '1'))
+            except (IndexError, TypeError, ValueError):
+                print("Flake8Lint ERROR: {0}".format(line))
+            continue
+        if line.startswith('timing:'):
+            row = line.split(':', 2)
+            try:
+                if timings is not None:
+                    timings[row[2]] = float(row[1])
+            except (IndexError, TypeError, ValueError):
+                print("Flake8Lint ERROR: {0}".format(line))
+            continue
         warning = line.split(':', 2)
         if len(warning) == 3:
             try:
@@ -360,6 +652,9 @@ def lint_external(lines, settings, interpreter, linter):
         else:
             print("Flake8Lint ERROR: {0}".format(line))
 
+    if complexity_check:
+        COMPLEXITY_TABLES[settings.get('filename')] = table
+
     # and return them =)
     return warnings
 
@@ -374,6 +669,12 @@ if __name__ == "__main__":
                             help="run pyflakes lint")
     arg_parser.add_argument('--builtins',
                             help="python builtins extend")
+    arg_parser.add_argument('--filename',
+                            help="linted file name")
+    arg_parser.add_argument('--symbol-index-roots',
+                            help="project roots to resolve star imports in")
+    arg_parser.add_argument('--symbol-index-path',
+                            help="star imports symbol index file")
     arg_parser.add_argument('--pep8', action='store_true',
                             help="run pep8 lint")
     arg_parser.add_argument('--pydocstyle', action='store_true',
@@ -388,13 +689,21 @@ if __name__ == "__main__":
                             help="import order style: cryptography or google")
     arg_parser.add_argument('--complexity', type=int,
                             help="check complexity")
+    arg_parser.add_argument('--complexity-table', action='store_true',
+                            help="print complexity table")
     arg_parser.add_argument('--pep8-max-line-length', type=int, default=79,
                             help="pep8 max line length")
+    arg_parser.add_argument('--timings', action='store_true',
+                            help="print checkers durations")
 
     lint_settings = arg_parser.parse_args().__dict__
 
     if lint_settings.get('builtins'):
         lint_settings['builtins'] = lint_settings['builtins'].split(',')
+    if lint_settings.get('symbol_index_roots'):
+        lint_settings['symbol_index_roots'] = (
+            lint_settings['symbol_index_roots'].split(os.pathsep)
+        )
 
     if '' == ''.encode():  # Python 2: implicit encoding
         stdin_lines = sys.stdin.read()
@@ -402,9 +711,22 @@ if __name__ == "__main__":
         stdin_lines = TextIOWrapper(sys.stdin.buffer, errors='ignore').read()
 
     # run lint and print errors
-    for lint_warning in lint(stdin_lines, lint_settings):
+    lint_timings = {} if lint_settings.get('timings') else None
+    for lint_warning in lint(stdin_lines, lint_settings, lint_timings):
         try:
             print("%d:%d:%s" % lint_warning)
         except Exception:
             print(lint_warning)
         sys.stdout.flush()
+
+    # print functions complexity table
+    if lint_settings.get('complexity_table'):
+        for row in complexity_table(lint_settings.get('filename')):
+            print("complexity:%d:%d:%d:%s" % (row[0], row[2], row[3], row[1]))
+        sys.stdout.flush()
+
+    # print checkers durations
+    if lint_timings is not None:
+        for phase, duration in sorted(lint_timings.items()):
+            print("timing:%f:%s" % (duration, phase))
+        sys.stdout.flush()